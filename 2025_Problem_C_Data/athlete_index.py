@@ -0,0 +1,147 @@
+import pandas as pd
+import numpy as np
+from data_schema import load_table
+
+# 运动员身份索引与职业生涯表
+# 将 (Name, Sex, NOC) 映射为整数ID，并以数组(CSR)形式存储每名运动员参加的各届奥运会：
+#   offsets[i]:offsets[i+1] 为运动员 i 在 edition_* 数组中的区间（按年份升序）
+# 在此基础上，各国"回归运动员/回归奖牌得主"等特征只需整数数组运算和 bincount，
+# 不再需要对运动员表做字符串 groupby。
+
+KEY_COLUMNS = ['Name', 'Sex', 'NOC']
+
+
+def build_athlete_index(athletes_df):
+    """返回 (athlete_keys, index)：athlete_keys 为 ID -> (Name, Sex, NOC) 表，index 为职业生涯数组字典。"""
+    athlete_id = athletes_df.groupby(KEY_COLUMNS, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+    athlete_keys = athletes_df.loc[~athletes_df.duplicated(subset=KEY_COLUMNS), KEY_COLUMNS].reset_index(drop=True)
+    athlete_keys.index.name = 'Athlete_ID'
+    n_athletes = len(athlete_keys)
+
+    # (运动员, 年份) 组合编码为单个整数，排序后即按 ID、年份有序
+    year_values, year_code = np.unique(athletes_df['Year'].to_numpy(), return_inverse=True)
+    edition_key = athlete_id.astype(np.int64) * len(year_values) + year_code
+    edition_key_unique, inverse = np.unique(edition_key, return_inverse=True)
+
+    is_medal = (athletes_df['Medal'] != 'No medal').to_numpy()
+    edition_medals = np.bincount(inverse, weights=is_medal, minlength=len(edition_key_unique)).astype(np.int16)
+    edition_athlete = (edition_key_unique // len(year_values)).astype(np.int32)
+    edition_year = year_values[edition_key_unique % len(year_values)].astype(np.int16)
+
+    offsets = np.searchsorted(edition_athlete, np.arange(n_athletes + 1)).astype(np.int32)
+    noc_values, noc_code = np.unique(athlete_keys['NOC'].to_numpy(dtype=str), return_inverse=True)
+
+    index = {
+        'offsets': offsets,
+        'edition_athlete': edition_athlete,
+        'edition_year': edition_year,
+        'edition_medals': edition_medals,
+        'first_year': edition_year[offsets[:-1]],
+        'last_year': edition_year[offsets[1:] - 1],
+        'n_editions': np.diff(offsets).astype(np.int16),
+        'noc_code': noc_code.astype(np.int16),
+        'noc_values': noc_values,
+    }
+    return athlete_keys, index
+
+
+def career_table(athlete_keys, index):
+    """每名运动员一行的职业生涯汇总表。"""
+    career = athlete_keys.copy()
+    career['First_Year'] = index['first_year']
+    career['Last_Year'] = index['last_year']
+    career['Editions'] = index['n_editions']
+    career['Career_Medals'] = np.bincount(
+        index['edition_athlete'], weights=index['edition_medals'], minlength=len(career)
+    ).astype(np.int16)
+    return career
+
+
+def returning_athlete_features(index):
+    """按 (NOC, Year) 汇总回归运动员特征：
+
+    - Returning_Athletes: 此前参加过奥运会的运动员数
+    - Returning_Medalists: 此前获得过奖牌的运动员数
+    - Experienced_Share: 回归运动员占比
+    - Avg_Prior_Editions: 平均已参加届数
+    """
+    offsets = index['offsets']
+    edition_athlete = index['edition_athlete']
+    edition_medals = index['edition_medals'].astype(np.int64)
+
+    start = offsets[edition_athlete]
+    prior_editions = np.arange(len(edition_athlete)) - start
+    cum_medals = np.cumsum(edition_medals)
+    prior_medals = cum_medals - edition_medals - (cum_medals[start] - edition_medals[start])
+
+    year_values, year_code = np.unique(index['edition_year'], return_inverse=True)
+    noc_code = index['noc_code'][edition_athlete].astype(np.int64)
+    group = noc_code * len(year_values) + year_code
+    n_groups = len(index['noc_values']) * len(year_values)
+
+    athletes = np.bincount(group, minlength=n_groups)
+    returning = np.bincount(group, weights=prior_editions > 0, minlength=n_groups)
+    returning_medalists = np.bincount(group, weights=prior_medals > 0, minlength=n_groups)
+    prior_sum = np.bincount(group, weights=prior_editions, minlength=n_groups)
+
+    present = np.flatnonzero(athletes)
+    features = pd.DataFrame({
+        'NOC': index['noc_values'][present // len(year_values)],
+        'Year': year_values[present % len(year_values)].astype(int),
+        'Returning_Athletes': returning[present].astype(int),
+        'Returning_Medalists': returning_medalists[present].astype(int),
+        'Experienced_Share': returning[present] / athletes[present],
+        'Avg_Prior_Editions': prior_sum[present] / athletes[present],
+    })
+    return features
+
+
+def save_athlete_index(athlete_keys, index, prefix='athlete_index'):
+    athlete_keys.to_csv(f'{prefix}_keys.csv', encoding='utf-8')
+    np.savez_compressed(f'{prefix}.npz', **index)
+
+
+def load_athlete_index(prefix='athlete_index'):
+    athlete_keys = pd.read_csv(f'{prefix}_keys.csv', index_col='Athlete_ID', encoding='utf-8')
+    with np.load(f'{prefix}.npz') as data:
+        index = {name: data[name] for name in data.files}
+    return athlete_keys, index
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("运动员身份索引与职业生涯表")
+    print("=" * 80)
+
+    # ============== 第1步：构建索引 ==============
+    print("\n[Step 1] 构建运动员ID索引...")
+
+    athletes_df = load_table('athletes')
+    athlete_keys, index = build_athlete_index(athletes_df)
+
+    array_bytes = sum(arr.nbytes for arr in index.values())
+    print(f"  ✓ {len(athletes_df)} 条记录 -> {len(athlete_keys)} 名运动员，{len(index['edition_year'])} 个(运动员, 届)组合")
+    print(f"  ✓ 职业生涯数组占用 {array_bytes / 1024:.1f} KB")
+
+    # ============== 第2步：保存 ==============
+    print("\n[Step 2] 保存索引与特征...")
+
+    save_athlete_index(athlete_keys, index)
+    career = career_table(athlete_keys, index)
+    career.to_csv('athlete_careers.csv', encoding='utf-8')
+    features = returning_athlete_features(index)
+    features.to_csv('athlete_career_features.csv', index=False, encoding='utf-8')
+
+    print("  ✓ athlete_index.npz / athlete_index_keys.csv")
+    print("  ✓ athlete_careers.csv")
+    print("  ✓ athlete_career_features.csv")
+
+    # ============== 报告 ==============
+    print("\n【职业生涯最长的运动员】")
+    print(career.sort_values(['Editions', 'Career_Medals'], ascending=False).head(10).to_string())
+
+    print("\n【2024年回归奖牌得主最多的国家】")
+    print(features[features['Year'] == 2024].nlargest(10, 'Returning_Medalists').to_string(index=False))
+
+    print("\n运动员索引构建完成! ✓")
+    print("=" * 80)
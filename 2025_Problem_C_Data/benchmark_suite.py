@@ -0,0 +1,217 @@
+import sys
+import os
+import re
+import time
+import shutil
+import tempfile
+import subprocess
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+# 合成数据生成器与规模基准测试
+# 仓库中没有运动员原始数据，这里按真实规模（行数、NOC/项目/小项基数）生成带随机种子的合成数据，
+# 在 1× / 10× / 100× 规模下依次运行清洗、特征（网格构建 + 聚合）、训练各阶段，
+# 记录每个阶段的耗时与峰值内存，追加到 benchmark_results.csv，便于发现性能回退与规模上限。
+# 用法: python benchmark_suite.py [规模 ...]     # 缺省为 1 10 100
+
+SEED = 2025
+REAL_ATHLETE_ROWS = 252566     # 原始运动员数据行数（见 数据清洗与特征提取说明书.md）
+N_NOCS = 234                   # 运动员数据中的 NOC 数
+ROWS_PER_ATHLETE = 1.9         # 平均每名运动员的记录数（多届、多小项）
+MEDAL_SHARE = 0.15             # 获奖记录占比
+FEMALE_SHARE = 0.3
+RESULTS_FILE = 'benchmark_results.csv'
+
+# 历届主办国作为实力最强的一批 NOC，保证主办国特征可以被识别
+HOST_NOCS = ['USA', 'GBR', 'FRA', 'CHN', 'GER', 'AUS', 'JPN', 'ITA', 'KOR', 'NED',
+             'SWE', 'CAN', 'ESP', 'BRA', 'GRE', 'FIN', 'BEL', 'MEX']
+# 清洗阶段会删除或改写的代码，合成数据中不使用
+RESERVED_NOCS = {'AHO', 'BLR', 'BOH', 'CRT', 'EUN', 'IOA', 'LIB', 'MAL', 'NBO', 'NFL', 'RHO', 'ROC',
+                 'RUS', 'UNK', 'URS', 'WIF', 'YUG', 'ANZ', 'SAA', 'VNM', 'YAR', 'YMD', 'FRG', 'GDR'}
+
+# 基准测试的各阶段：(阶段名, 脚本)
+STAGES = [
+    ('cleaning', 'data_cleaning.py'),
+    ('features', 'complete_data_processing.py'),   # 网格构建 + 聚合，按脚本内的 [Step N] 细分耗时
+    ('training', 'modeling_strategy.py'),
+]
+# 从仓库复制到工作目录的真实小表
+STATIC_FILES = ['summerOly_hosts.csv', 'summerOly_programs.csv', 'data_dictionary.csv']
+STEP_PATTERN = re.compile(r'^\s*\[(Step \d+)\]\s*(.*)')
+
+
+def programme_slots(programs_df):
+    """由赛事表展开全部 (Year, Sport, Event) 组合：每个分项在某年有 n 个小项，就生成 n 个小项名。"""
+    programs_df = programs_df[~programs_df['Sport'].str.startswith('Total')]
+    year_columns = [col for col in programs_df.columns if col.isdigit()]
+    counts = programs_df[year_columns].apply(pd.to_numeric, errors='coerce').fillna(0).astype(int)
+    discipline = programs_df['Discipline'].fillna(programs_df['Sport'])
+    long = counts.set_axis(discipline + '|' + programs_df['Sport']).stack()
+    long = long[long > 0]
+    keys = np.repeat(long.index.get_level_values(0).to_numpy(), long.to_numpy())
+    years = np.repeat(long.index.get_level_values(1).astype(int).to_numpy(), long.to_numpy())
+    rank = pd.Series(keys).groupby([keys, years]).cumcount().to_numpy() + 1
+    discipline, sport = np.char.partition(keys.astype(str), '|')[:, [0, 2]].T
+    return pd.DataFrame({'Year': years, 'Sport': sport, 'Event': np.char.add(discipline, np.char.add(' Event ', rank.astype(str)))})
+
+
+def noc_codes(rng, n=N_NOCS):
+    """主办国代码加上随机生成的三字母代码，按实力（Zipf 权重）排序。"""
+    letters = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    candidates = [''.join(c) for c in letters[rng.integers(0, 26, size=(n * 3, 3))]]
+    extra = [code for code in dict.fromkeys(candidates) if code not in RESERVED_NOCS and code not in HOST_NOCS]
+    codes = np.array(HOST_NOCS + extra[:n - len(HOST_NOCS)])
+    strength = 1.0 / np.arange(1, len(codes) + 1) ** 0.8
+    return codes, strength / strength.sum()
+
+
+def generate_synthetic(scale, workdir, programs_df, seed=SEED):
+    """在 workdir 中写出原始格式的 summerOly_athletes.csv 与 summerOly_medal_counts.csv。
+
+    按年份分块生成并追加写入，100× 规模下内存占用只取决于单届的数据量。返回运动员记录数。"""
+    rng = np.random.default_rng(seed)
+    slots = programme_slots(programs_df)
+    codes, weights = noc_codes(rng)
+    teams = np.char.add('Country ', codes)
+    n_rows = int(REAL_ATHLETE_ROWS * scale)
+    n_years = slots['Year'].nunique()
+    # 运动员按首次参赛的届次排列：第 i 届的参赛者从 [i*step, (i+3)*step) 中抽取，
+    # 因此每人的职业生涯跨越相邻的约3届；每名运动员固定属于一个 NOC
+    step = int(n_rows / ROWS_PER_ATHLETE / (n_years + 2))
+    person_noc = rng.choice(len(codes), (n_years + 2) * step, p=weights).astype(np.int16)
+
+    # 每届的记录数与该届小项数成正比
+    events_per_year = slots.groupby('Year').size()
+    rows_per_year = rng.multinomial(n_rows, (events_per_year / events_per_year.sum()).to_numpy())
+
+    athletes_path = os.path.join(workdir, 'summerOly_athletes.csv')
+    medal_frames = []
+    for year_index, ((year, year_slots), n) in enumerate(zip(slots.groupby('Year'), rows_per_year)):
+        slot = rng.integers(0, len(year_slots), n)
+        person = year_index * step + rng.integers(0, 3 * step, n)
+        noc = person_noc[person]
+        # 强国获奖概率更高，整体获奖比例保持在 MEDAL_SHARE 附近
+        medal_p = np.clip(MEDAL_SHARE * weights[noc] * len(codes) ** 0.5, 0, 0.9)
+        medal_p *= MEDAL_SHARE / medal_p.mean()
+        medal = np.where(rng.random(n) < medal_p, rng.choice(['Gold', 'Silver', 'Bronze'], n), 'No medal')
+
+        chunk = pd.DataFrame({
+            'Name': np.char.add('Athlete ', person.astype(str)),
+            'Sex': np.where(person % 10 < FEMALE_SHARE * 10, 'F', 'M'),
+            'Team': teams[noc],
+            'NOC': codes[noc],
+            'Year': year,
+            'City': f'City {year}',
+            'Sport': year_slots['Sport'].to_numpy()[slot],
+            'Event': year_slots['Event'].to_numpy()[slot],
+            'Medal': medal,
+        })
+        chunk.to_csv(athletes_path, mode='a', header=not medal_frames, index=False)
+
+        # 奖牌榜：团体项目同一国家同一小项同一奖牌只计一次
+        units = chunk[chunk['Medal'] != 'No medal'].drop_duplicates(subset=['NOC', 'Event', 'Medal'])
+        table = pd.crosstab(units['Team'], units['Medal']).reindex(columns=['Gold', 'Silver', 'Bronze'], fill_value=0)
+        table['Total'] = table.sum(axis=1)
+        table = table.sort_values(['Gold', 'Total'], ascending=False)
+        table.insert(0, 'Rank', np.arange(1, len(table) + 1))
+        medal_frames.append(table.rename_axis('NOC').reset_index().assign(Year=year))
+
+    medal_counts = pd.concat(medal_frames, ignore_index=True)
+    medal_counts[['Rank', 'NOC', 'Gold', 'Silver', 'Bronze', 'Total', 'Year']].to_csv(
+        os.path.join(workdir, 'summerOly_medal_counts.csv'), index=False
+    )
+    return n_rows
+
+
+def run_stage(script, workdir):
+    """在子进程中运行一个阶段，返回 (退出码, 总耗时, 峰值内存MB, [(步骤, 耗时)])。
+
+    通过 os.wait4 取得该子进程自身的 rusage；步骤耗时按输出中 [Step N] 标记之间的间隔计算。"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-u', script], cwd=workdir, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace')
+    marks = []
+    tail = []
+    for line in proc.stdout:
+        match = STEP_PATTERN.match(line)
+        if match:
+            marks.append((f"{match.group(1)} {match.group(2).rstrip('.')}", time.perf_counter()))
+        tail = (tail + [line])[-20:]
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    end = time.perf_counter()
+
+    if proc.returncode != 0:
+        print(''.join(tail))
+    steps = [(name, next_time - mark_time)
+             for (name, mark_time), (_, next_time) in zip(marks, marks[1:] + [(None, end)])]
+    # Linux 下 ru_maxrss 单位为 KB，macOS 下为字节
+    peak_mb = usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    return proc.returncode, end - start, peak_mb, steps
+
+
+def benchmark_scale(scale, source_dir='.'):
+    """在临时目录中生成某一规模的数据并依次运行各阶段，返回结果行列表。"""
+    workdir = tempfile.mkdtemp(prefix=f'olympics_bench_{scale}x_')
+    rows = []
+    try:
+        for name in STATIC_FILES + [f for f in os.listdir(source_dir) if f.endswith('.py')]:
+            shutil.copy(os.path.join(source_dir, name), workdir)
+        programs_df = pd.read_csv(os.path.join(workdir, 'summerOly_programs.csv'), encoding='latin-1')
+
+        start = time.perf_counter()
+        n_rows = generate_synthetic(scale, workdir, programs_df)
+        rows.append({'Scale': scale, 'Stage': 'generate', 'Step': '', 'Input_Rows': n_rows,
+                     'Seconds': time.perf_counter() - start, 'Peak_MB': np.nan, 'Status': 0})
+        print(f"  ✓ [{scale}×] 生成 {n_rows} 条运动员记录 ({rows[-1]['Seconds']:.1f} 秒)")
+
+        for stage, script in STAGES:
+            status, seconds, peak_mb, steps = run_stage(script, workdir)
+            rows.append({'Scale': scale, 'Stage': stage, 'Step': '', 'Input_Rows': n_rows,
+                         'Seconds': seconds, 'Peak_MB': peak_mb, 'Status': status})
+            rows.extend({'Scale': scale, 'Stage': stage, 'Step': step, 'Input_Rows': n_rows,
+                         'Seconds': step_seconds, 'Peak_MB': np.nan, 'Status': status}
+                        for step, step_seconds in steps)
+            mark = '✓' if status == 0 else '✗'
+            print(f"  {mark} [{scale}×] {stage}: {seconds:.1f} 秒，峰值内存 {peak_mb:.0f} MB")
+            if status != 0:
+                break   # 后续阶段依赖本阶段的输出
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("合成数据规模基准测试")
+    print("=" * 80)
+
+    scales = [float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    run_at = datetime.now().isoformat(timespec='seconds')
+    print(f"\n规模: {scales}，随机种子: {SEED}")
+
+    results = []
+    for scale in scales:
+        print(f"\n[规模 {scale}×]")
+        results.extend(benchmark_scale(scale))
+
+    # ============== 保存 ==============
+    results = pd.DataFrame(results).assign(Run_At=run_at)
+    write_header = not os.path.exists(RESULTS_FILE)
+    results.to_csv(RESULTS_FILE, mode='a', header=write_header, index=False, encoding='utf-8')
+    print(f"\n  ✓ 结果已追加到 {RESULTS_FILE}")
+
+    # ============== 报告 ==============
+    print("\n" + "=" * 80)
+    print("各阶段耗时 (秒) / 峰值内存 (MB)")
+    print("=" * 80)
+    stages = results[results['Step'] == ''].copy()
+    stages['Stage'] = pd.Categorical(stages['Stage'], ['generate'] + [stage for stage, _ in STAGES])
+    print(stages.pivot(index='Stage', columns='Scale', values='Seconds').round(2).to_string())
+    print()
+    print(stages.pivot(index='Stage', columns='Scale', values='Peak_MB').round(0).to_string())
+
+    print("\n基准测试完成! ✓")
+    print("=" * 80)
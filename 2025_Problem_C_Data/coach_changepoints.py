@@ -0,0 +1,140 @@
+import time
+
+import pandas as pd
+import numpy as np
+from data_schema import load_table
+
+# "伟大教练"效应：NOC × Sport 序列上的突变点检测
+# Avg_Sport_Efficiency 把各项目平均成一个数，丢掉了教练效应所需的项目级信号。
+# 这里先构建 (NOC, Sport, Year) 三维张量（奖牌单位数、不重复运动员数、效率），
+# 再对所有序列一次性做均值突变的似然比扫描（等价于标准化 CUSUM 的最大值），
+# 全程基于 NumPy 的累积和，不对单条序列做 Python 循环。
+
+MIN_SEGMENT = 3    # 突变点两侧至少需要的参赛届数
+TOP_N = 30         # 报告中展示的候选数量
+
+
+def build_sport_tensor(athletes_df):
+    """返回 (nocs, sports, years, medals, athletes)，后两者形状为 (NOC数, Sport数, 年份数)。"""
+    valid = athletes_df['NOC'].notna() & athletes_df['Sport'].notna()
+    df = athletes_df.loc[valid, ['NOC', 'Sport', 'Year', 'Name', 'Is_Medal_Unit']]
+
+    noc_code, nocs = pd.factorize(df['NOC'], sort=True)
+    sport_code, sports = pd.factorize(df['Sport'], sort=True)
+    year_code, years = pd.factorize(df['Year'], sort=True)
+    shape = (len(nocs), len(sports), len(years))
+    flat = np.ravel_multi_index((noc_code, sport_code, year_code), shape)
+
+    medals = np.bincount(flat, weights=df['Is_Medal_Unit'].to_numpy(dtype=float), minlength=np.prod(shape))
+
+    # 分母：同一 (NOC, Sport, Year) 内不重复的运动员
+    first_entry = ~df.duplicated(subset=['NOC', 'Sport', 'Year', 'Name']).to_numpy()
+    athletes = np.bincount(flat[first_entry], minlength=np.prod(shape))
+
+    return (np.asarray(nocs), np.asarray(sports), np.asarray(years),
+            medals.reshape(shape), athletes.reshape(shape))
+
+
+def scan_mean_shift(values, observed, min_segment=MIN_SEGMENT):
+    """对 (序列数, 时间) 矩阵的每一行寻找最显著的均值突变点。
+
+    未参赛的年份 (observed == False) 不计入任一侧。对每个切分位置 k 计算
+        LR_k = n1 * n2 / n * (mean1 - mean2)^2 / s^2
+    其中 s^2 为两段合并后的组内方差；返回每行的最大统计量及其位置和两侧均值。
+    """
+    x = np.where(observed, values, 0.0)
+    w = observed.astype(float)
+
+    n1 = np.cumsum(w, axis=1)[:, :-1]          # 切分点 k 之前（含 k）的观测数
+    s1 = np.cumsum(x, axis=1)[:, :-1]
+    n = w.sum(axis=1, keepdims=True)
+    s = x.sum(axis=1, keepdims=True)
+    ss = (x ** 2).sum(axis=1, keepdims=True)
+    n2 = n - n1
+    s2 = s - s1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean1 = s1 / n1
+        mean2 = s2 / n2
+        within = ss - n1 * mean1 ** 2 - n2 * mean2 ** 2
+        variance = within / (n - 2)
+        stat = n1 * n2 / n * (mean1 - mean2) ** 2 / variance
+
+    # 两侧观测太少、或方差为0（序列恒定）的切分点不参与比较
+    valid = (n1 >= min_segment) & (n2 >= min_segment) & (variance > 1e-12)
+    # 切分点只放在实际参赛的年份之后，避免同一突变在空白年份上重复出现
+    valid &= observed[:, :-1]
+    stat = np.where(valid, stat, -np.inf)
+
+    best = np.argmax(stat, axis=1)
+    rows = np.arange(len(stat))
+    return stat[rows, best], best, mean1[rows, best], mean2[rows, best]
+
+
+def detect_changepoints(nocs, sports, years, medals, athletes, min_segment=MIN_SEGMENT):
+    """对所有 NOC × Sport 序列（奖牌数与效率两种指标）检测突变，返回按统计量排序的候选表。"""
+    n_noc, n_sport, n_year = medals.shape
+    observed = (athletes > 0).reshape(-1, n_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency = np.where(athletes > 0, medals / athletes, 0.0).reshape(-1, n_year)
+    series_noc = np.repeat(np.arange(n_noc), n_sport)
+    series_sport = np.tile(np.arange(n_sport), n_noc)
+
+    frames = []
+    for metric, values in [('Medals', medals.reshape(-1, n_year)), ('Efficiency', efficiency)]:
+        stat, split, before, after = scan_mean_shift(values, observed, min_segment)
+        found = np.isfinite(stat)
+        # 新阶段从切分点之后第一个参赛年份开始
+        next_observed = np.argmax(observed[found] & (np.arange(n_year) > split[found][:, None]), axis=1)
+        frames.append(pd.DataFrame({
+            'NOC': nocs[series_noc[found]],
+            'Sport': sports[series_sport[found]],
+            'Metric': metric,
+            'Change_Year': years[next_observed],
+            'Mean_Before': before[found],
+            'Mean_After': after[found],
+            'Jump': after[found] - before[found],
+            'Statistic': stat[found],
+            'Editions': observed[found].sum(axis=1),
+        }))
+
+    candidates = pd.concat(frames, ignore_index=True)
+    return candidates.sort_values('Statistic', ascending=False).reset_index(drop=True), len(observed)
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("教练效应分析：NOC × Sport 突变点检测")
+    print("=" * 80)
+
+    # ============== 第1步：构建张量 ==============
+    print("\n[Step 1] 构建 NOC × Sport × Year 张量...")
+
+    athletes_df = load_table('athletes')
+    start = time.perf_counter()
+    nocs, sports, years, medals, athletes = build_sport_tensor(athletes_df)
+    print(f"  ✓ 张量形状 {medals.shape}，非空格点 {(athletes > 0).sum()} 个 ({time.perf_counter() - start:.2f} 秒)")
+
+    # ============== 第2步：突变点扫描 ==============
+    print("\n[Step 2] 向量化扫描全部序列...")
+
+    start = time.perf_counter()
+    candidates, n_series = detect_changepoints(nocs, sports, years, medals, athletes)
+    elapsed = time.perf_counter() - start
+    print(f"  ✓ 扫描 {n_series} 条序列 × 2 种指标，得到 {len(candidates)} 个候选突变 ({elapsed:.2f} 秒)")
+
+    # ============== 第3步：保存 ==============
+    print("\n[Step 3] 保存结果...")
+
+    candidates.to_csv('coach_changepoints.csv', index=False, encoding='utf-8')
+    print("  ✓ coach_changepoints.csv")
+
+    # ============== 报告 ==============
+    print("\n" + "=" * 80)
+    print(f"最显著的 {TOP_N} 个正向突变（候选教练效应）")
+    print("=" * 80)
+    jumps_up = candidates[candidates['Jump'] > 0].head(TOP_N)
+    print(jumps_up.round(3).to_string(index=False))
+
+    print("\n突变点检测完成! ✓")
+    print("=" * 80)
@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+from athlete_index import build_athlete_index, returning_athlete_features
+from data_schema import load_table
 
 print("=" * 80)
 print("完整数据清洗与特征提取")
@@ -8,10 +10,11 @@ print("=" * 80)
 # ============== 步骤1：读取和检查原始数据 ==============
 print("\n[Step 1] 读取原始数据...")
 
-athletes_df = pd.read_csv('summerOly_athletes_cleaned.csv', encoding='utf-8-sig')
-medal_counts_df = pd.read_csv('summerOly_medal_counts_cleaned.csv', encoding='utf-8-sig')
-hosts_df = pd.read_csv('summerOly_hosts_cleaned.csv', encoding='utf-8-sig')
-programs_df = pd.read_csv('summerOly_programs_cleaned.csv', encoding='utf-8-sig')
+# 统一使用 data_schema 中的紧凑类型（category / int16 / int32 / bool）
+athletes_df = load_table('athletes')
+medal_counts_df = load_table('medal_counts')
+hosts_df = load_table('hosts')
+programs_df = load_table('programs')
 
 print(f"✓ 运动员数据: {len(athletes_df)} 条")
 print(f"✓ 奖牌数据: {len(medal_counts_df)} 条")
@@ -53,19 +56,21 @@ def map_country_name_to_code(name):
     return name  # 返回原值
 
 # 对medal_counts中的NOC列应用映射
-medal_counts_df['NOC_Code'] = medal_counts_df['NOC'].apply(map_country_name_to_code)
+# NOC 为分类类型：只对去重后的国家名称各映射一次
+noc_names = medal_counts_df['NOC'].astype(str)
+medal_counts_df['NOC_Code'] = noc_names.map({name: map_country_name_to_code(name) for name in noc_names.unique()})
 
 # 检查有多少条记录被成功映射
-unmapped = (medal_counts_df['NOC_Code'] == medal_counts_df['NOC']).sum()
+unmapped = (medal_counts_df['NOC_Code'] == noc_names).sum()
 print(f"✓ 成功映射了 {len(medal_counts_df) - unmapped} 条奖牌记录")
 
 if unmapped > 0:
     print(f"⚠ 警告: {unmapped} 条记录未被映射（可能需要手动修复）")
-    unmapped_countries = medal_counts_df[medal_counts_df['NOC_Code'] == medal_counts_df['NOC']]['NOC'].unique()
+    unmapped_countries = noc_names[medal_counts_df['NOC_Code'] == noc_names].unique()
     print(f"  未映射的国家: {unmapped_countries[:10]}")
 
 # 使用映射后的代码
-medal_counts_df['NOC'] = medal_counts_df['NOC_Code']
+medal_counts_df['NOC'] = medal_counts_df['NOC_Code'].astype('category')
 medal_counts_df = medal_counts_df.drop('NOC_Code', axis=1)
 
 print(f"✓ 奖牌数据中的NOC已更新")
@@ -92,7 +97,7 @@ print(f"✓ 涵盖 {len(all_countries)} 个国家和 {len(all_years)} 个年份"
 # ============== 步骤4：添加当年奖牌数 ==============
 print("\n[Step 4] 添加当年奖牌数...")
 
-medal_features = medal_counts_df.groupby(['NOC', 'Year']).agg({
+medal_features = medal_counts_df.groupby(['NOC', 'Year'], observed=True).agg({
     'Gold': 'sum',
     'Silver': 'sum',
     'Bronze': 'sum',
@@ -149,7 +154,9 @@ print(f"✓ 识别了 {country_year_df['Is_Host'].sum()} 个主办国记录")
 # ============== 步骤7：添加运动员特征 ==============
 print("\n[Step 7] 添加运动员特征...")
 
-athlete_features = athletes_df.groupby(['NOC', 'Year']).agg({
+# 参赛者视图：同一运动员参加多个项目只计一次
+athlete_roster = athletes_df.drop_duplicates(subset=['NOC', 'Year', 'Name'])
+athlete_features = athlete_roster.groupby(['NOC', 'Year'], observed=True).agg({
     'Name': 'count',
     'Sex': lambda x: (x == 'F').sum()
 }).reset_index().rename(columns={
@@ -172,7 +179,7 @@ print(f"✓ 添加了 {len(athlete_features)} 条运动员特征")
 # ============== 步骤8：添加项目特征 ==============
 print("\n[Step 8] 添加项目特征...")
 
-sport_coverage = athletes_df.groupby(['NOC', 'Year']).agg({
+sport_coverage = athletes_df.groupby(['NOC', 'Year'], observed=True).agg({
     'Sport': 'nunique',
     'Event': 'nunique'
 }).reset_index().rename(columns={
@@ -201,15 +208,18 @@ print("✓ 添加了全局奥运会金牌数特征")
 # ============== 步骤10：添加项目效率特征 ==============
 print("\n[Step 10] 计算项目效率特征...")
 
-athletes_with_medals = athletes_df[athletes_df['Medal'] != 'No medal'].copy()
-medal_by_sport = athletes_with_medals.groupby(['NOC', 'Year', 'Sport']).size().reset_index(name='Sport_Medals')
-athlete_by_sport = athletes_df.groupby(['NOC', 'Year', 'Sport']).size().reset_index(name='Sport_Athletes')
+# 分子用奖牌单位视图（团体奖牌只计一次），分母用参赛者视图中的不重复运动员数
+athletes_with_medals = athletes_df[athletes_df['Is_Medal_Unit']].copy()
+medal_by_sport = athletes_with_medals.groupby(['NOC', 'Year', 'Sport'], observed=True).size().reset_index(name='Sport_Medals')
+athlete_by_sport = athletes_df.drop_duplicates(subset=['NOC', 'Year', 'Sport', 'Name']).groupby(
+    ['NOC', 'Year', 'Sport'], observed=True
+).size().reset_index(name='Sport_Athletes')
 
 sport_efficiency = medal_by_sport.merge(athlete_by_sport, on=['NOC', 'Year', 'Sport'], how='left')
 sport_efficiency['Sport_Efficiency'] = (sport_efficiency['Sport_Medals'] / 
                                          sport_efficiency['Sport_Athletes'].clip(lower=1))
 
-avg_efficiency = sport_efficiency.groupby(['NOC', 'Year'])['Sport_Efficiency'].mean().reset_index().rename(
+avg_efficiency = sport_efficiency.groupby(['NOC', 'Year'], observed=True)['Sport_Efficiency'].mean().reset_index().rename(
     columns={'Sport_Efficiency': 'Avg_Sport_Efficiency'}
 )
 
@@ -218,8 +228,23 @@ country_year_df['Avg_Sport_Efficiency'] = country_year_df['Avg_Sport_Efficiency'
 
 print("✓ 添加了项目效率特征")
 
-# ============== 步骤11：保存特征数据集 ==============
-print("\n[Step 11] 保存特征数据集...")
+# ============== 步骤11：添加运动员经验特征 ==============
+print("\n[Step 11] 添加运动员经验特征...")
+
+# 基于运动员ID索引的整数数组运算，避免对运动员表的字符串 groupby
+_, athlete_index = build_athlete_index(athletes_df)
+career_features = returning_athlete_features(athlete_index)
+
+country_year_df = country_year_df.merge(career_features, on=['NOC', 'Year'], how='left')
+for col in ['Returning_Athletes', 'Returning_Medalists', 'Experienced_Share', 'Avg_Prior_Editions']:
+    country_year_df[col] = country_year_df[col].fillna(0)
+country_year_df['Returning_Athletes'] = country_year_df['Returning_Athletes'].astype(int)
+country_year_df['Returning_Medalists'] = country_year_df['Returning_Medalists'].astype(int)
+
+print("✓ 添加了回归运动员/回归奖牌得主特征")
+
+# ============== 步骤12：保存特征数据集 ==============
+print("\n[Step 12] 保存特征数据集...")
 
 country_year_df = country_year_df.sort_values(['NOC', 'Year']).reset_index(drop=True)
 country_year_df.to_csv('country_year_features.csv', index=False, encoding='utf-8')
@@ -0,0 +1,172 @@
+import pandas as pd
+import numpy as np
+from data_schema import load_table
+
+# 国家相似度索引：为历史很短或空白的国家借用相似国家的奖牌轨迹
+# 在特征网格中，国家未参赛的年份 Lag_* 为 0（或在网格开头为 NaN），
+# 直接 fillna(0) 会把"首次/重新参赛"的国家当成零奖牌国家。
+# 这里按年份用当年参赛画像（规模、女性比例、项目覆盖、赛事覆盖率）构建单位向量，
+# 对所有年份一次性做批量余弦相似度 (einsum)，取 k 个有完整历史的最近邻，
+# 再用相似度加权平均填补冷启动国家的滞后特征。
+
+K_NEIGHBORS = 5
+
+# 需要填补的列 -> 对应的滞后届数
+COLD_START_COLUMNS = {
+    'Lag_1_Gold': 1, 'Lag_1_Total': 1,
+    'Lag_2_Gold': 2, 'Lag_2_Total': 2,
+    'Lag_3_Gold': 3, 'Lag_3_Total': 3,
+    'Avg_3yr_Gold': 1, 'Avg_3yr_Total': 1,
+}
+
+
+def programme_events(programs_df):
+    """从赛事表的 "Total events" 行取出每年的总小项数。"""
+    total_row = programs_df[programs_df['Sport'] == 'Total events']
+    year_columns = [col for col in programs_df.columns if str(col)[:4].isdigit() and len(str(col)) == 4]
+    events = pd.to_numeric(total_row[year_columns].iloc[0], errors='coerce')
+    events.index = events.index.astype(int)
+    return events
+
+
+def build_profiles(df, programs_df=None):
+    """每个 (NOC, Year) 的参赛画像，标准化后归一化为单位向量。"""
+    if programs_df is not None:
+        events = df['Year'].map(programme_events(programs_df)).astype(float)
+    else:
+        events = pd.Series(np.nan, index=df.index)
+    # 赛事表缺失的年份用当年参赛最多的国家的小项数近似
+    events = events.fillna(df.groupby('Year')['Event_Count'].transform('max')).clip(lower=1)
+
+    profile = np.column_stack([
+        np.log1p(df['Athlete_Count'].to_numpy(dtype=float)),
+        df['Female_Ratio'].to_numpy(dtype=float),
+        df['Sport_Count'].to_numpy(dtype=float),
+        np.log1p(df['Event_Count'].to_numpy(dtype=float)),
+        (df['Event_Count'] / events).to_numpy(dtype=float),
+    ])
+    participating = df['Athlete_Count'].to_numpy() > 0
+    mean = profile[participating].mean(axis=0)
+    std = profile[participating].std(axis=0)
+    profile = (profile - mean) / np.where(std > 0, std, 1.0)
+    norm = np.linalg.norm(profile, axis=1, keepdims=True)
+    return profile / np.where(norm > 0, norm, 1.0)
+
+
+def history_flags(df):
+    """(行, 滞后届数) 的布尔矩阵：该国在 Year 之前第 lag 届是否真正参赛。"""
+    participated = (df['Athlete_Count'] > 0).astype(float)
+    grouped = participated.groupby(df['NOC'].astype(str))
+    return np.column_stack([grouped.shift(lag).fillna(0).to_numpy() > 0 for lag in (1, 2, 3)])
+
+
+def neighbour_index(df, profiles, k=K_NEIGHBORS):
+    """按年份批量计算 k 近邻。
+
+    返回 (nocs, years, neighbours, similarity)，neighbours/similarity 形状为 (年份数, 国家数, k)；
+    候选邻居限定为当年参赛且此前3届均参赛（历史完整）的国家。
+    """
+    nocs, noc_code = np.unique(df['NOC'].astype(str).to_numpy(), return_inverse=True)
+    years, year_code = np.unique(df['Year'].to_numpy(), return_inverse=True)
+
+    tensor = np.zeros((len(years), len(nocs), profiles.shape[1]))
+    tensor[year_code, noc_code] = profiles
+    candidate = np.zeros((len(years), len(nocs)), dtype=bool)
+    candidate[year_code, noc_code] = (df['Athlete_Count'].to_numpy() > 0) & history_flags(df).all(axis=1)
+
+    similarity = np.einsum('ynd,ymd->ynm', tensor, tensor)
+    similarity[:, np.arange(len(nocs)), np.arange(len(nocs))] = -np.inf   # 排除自身
+    similarity = np.where(candidate[:, np.newaxis, :], similarity, -np.inf)
+
+    k = min(k, len(nocs) - 1)
+    top = np.argpartition(-similarity, k - 1, axis=2)[:, :, :k]
+    top_similarity = np.take_along_axis(similarity, top, axis=2)
+    order = np.argsort(-top_similarity, axis=2)
+    return nocs, years, np.take_along_axis(top, order, axis=2), np.take_along_axis(top_similarity, order, axis=2)
+
+
+def neighbour_table(nocs, years, neighbours, similarity):
+    """把近邻数组展开为 (NOC, Year, Rank, Neighbour, Similarity) 长表。"""
+    n_year, n_noc, k = neighbours.shape
+    table = pd.DataFrame({
+        'NOC': np.tile(np.repeat(nocs, k), n_year),
+        'Year': np.repeat(years, n_noc * k),
+        'Rank': np.tile(np.arange(1, k + 1), n_year * n_noc),
+        'Neighbour': nocs[neighbours.ravel()],
+        'Similarity': similarity.ravel(),
+    })
+    return table[np.isfinite(table['Similarity'])].reset_index(drop=True)
+
+
+def fill_cold_start(df, programs_df=None, k=K_NEIGHBORS):
+    """对当年参赛、但对应滞后届未参赛（或无记录）的行，用近邻国家同年同列的加权均值替换滞后特征。
+
+    返回 (填补后的 DataFrame, 被填补的单元格数)。
+    """
+    df = df.copy()
+    profiles = build_profiles(df, programs_df)
+    nocs, years, neighbours, similarity = neighbour_index(df, profiles, k)
+    noc_code = np.searchsorted(nocs, df['NOC'].astype(str).to_numpy())
+    year_code = np.searchsorted(years, df['Year'].to_numpy())
+
+    weights = np.where(np.isfinite(similarity), np.clip(similarity, 0, None), 0.0)
+    weight_sum = weights.sum(axis=2)
+    history = history_flags(df)
+    participating = df['Athlete_Count'].to_numpy() > 0
+
+    filled = 0
+    for col, lag in COLD_START_COLUMNS.items():
+        if col not in df.columns:
+            continue
+        values = np.full((len(years), len(nocs)), np.nan)
+        values[year_code, noc_code] = df[col].to_numpy(dtype=float)
+        neighbour_values = np.take_along_axis(values, neighbours.reshape(len(years), -1), axis=1)
+        neighbour_values = neighbour_values.reshape(neighbours.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            borrowed = np.nansum(weights * neighbour_values, axis=2) / weight_sum
+
+        cold = participating & ~history[:, lag - 1]
+        row_borrowed = borrowed[year_code, noc_code]
+        fill_mask = cold & np.isfinite(row_borrowed)
+        df[col] = np.where(fill_mask, row_borrowed, df[col]).astype(df[col].dtype)
+        filled += int(fill_mask.sum())
+    return df, filled
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("国家相似度索引与冷启动填补")
+    print("=" * 80)
+
+    # ============== 第1步：构建画像与近邻 ==============
+    print("\n[Step 1] 构建国家画像并批量计算近邻...")
+
+    df = load_table('features')
+    programs_df = load_table('programs')
+    profiles = build_profiles(df, programs_df)
+    nocs, years, neighbours, similarity = neighbour_index(df, profiles)
+    table = neighbour_table(nocs, years, neighbours, similarity)
+
+    print(f"  ✓ {len(nocs)} 个国家 × {len(years)} 个年份，每个取 {neighbours.shape[2]} 个近邻")
+
+    # ============== 第2步：冷启动填补 ==============
+    print("\n[Step 2] 冷启动填补...")
+
+    filled_df, filled = fill_cold_start(df, programs_df)
+    print(f"  ✓ 填补了 {filled} 个滞后特征单元格")
+
+    # ============== 第3步：保存 ==============
+    print("\n[Step 3] 保存近邻表...")
+
+    table.to_csv('country_neighbors.csv', index=False, encoding='utf-8')
+    print("  ✓ country_neighbors.csv")
+
+    print("\n【2024年示例：近邻国家】")
+    for noc in ['CHN', 'FRA', 'KEN']:
+        sub = table[(table['NOC'] == noc) & (table['Year'] == 2024)]
+        if len(sub) > 0:
+            pairs = ', '.join(f"{row.Neighbour}({row.Similarity:.2f})" for row in sub.itertuples())
+            print(f"  {noc}: {pairs}")
+
+    print("\n相似度索引构建完成! ✓")
+    print("=" * 80)
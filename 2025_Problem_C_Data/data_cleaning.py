@@ -1,11 +1,14 @@
 import pandas as pd
 import numpy as np
+from normalize_inputs import ensure_canonical, canonical_path
 
-# 读取原始数据（处理编码问题）
-athletes_df = pd.read_csv('summerOly_athletes.csv', encoding='latin-1')
-medal_counts_df = pd.read_csv('summerOly_medal_counts.csv', encoding='latin-1')
-programs_df = pd.read_csv('summerOly_programs.csv', encoding='latin-1')
-hosts_df = pd.read_csv('summerOly_hosts.csv', encoding='latin-1')
+# 读取原始数据：编码检测、NFKC 规范化与 NBSP 去除由 normalize_inputs.py 统一完成（源文件未变时直接复用），
+# 这里只读取规范化后的 UTF-8 文件
+ensure_canonical()
+athletes_df = pd.read_csv(canonical_path('summerOly_athletes.csv'), encoding='utf-8')
+medal_counts_df = pd.read_csv(canonical_path('summerOly_medal_counts.csv'), encoding='utf-8')
+programs_df = pd.read_csv(canonical_path('summerOly_programs.csv'), encoding='utf-8')
+hosts_df = pd.read_csv(canonical_path('summerOly_hosts.csv'), encoding='utf-8')
 
 print("=" * 80)
 print("开始数据清洗")
@@ -127,16 +130,25 @@ print("\n[Step 5] 处理团体项目去重...")
 
 # 对于团体项目，同一国家同一项目同一奖牌只算一次
 # 去重的key: Year, NOC, Event, Medal
-athletes_dedup = athletes_df.drop_duplicates(subset=['Year', 'NOC', 'Event', 'Medal'], keep='first').reset_index(drop=True)
-dedup_count = len(athletes_df) - len(athletes_dedup)
+# 注意：不能直接 drop_duplicates，否则同一项目的所有未获奖运动员会被压缩成一行，
+# 导致 Athlete_Count / Female_Ratio / Sport_Efficiency 的分母失真。
+# 这里一次哈希分组同时得到两个视图，并存放在同一张表中：
+#   - 参赛者视图：全部运动员记录（用于人数类特征）
+#   - 奖牌单位视图：Is_Medal_Unit == True 的记录，每个团体奖牌只计一次
+dedup_key = ['Year', 'NOC', 'Event', 'Medal']
+first_in_group = ~athletes_df.duplicated(subset=dedup_key, keep='first')
+athletes_df['Is_Medal_Unit'] = first_in_group & (athletes_df['Medal'] != 'No medal')
 
-print(f"  ✓ 删除了 {dedup_count} 条重复的团体项目记录")
-print(f"  运动员数据去重后: {len(athletes_dedup)} 条记录")
+medal_rows = (athletes_df['Medal'] != 'No medal').sum()
+medal_units = athletes_df['Is_Medal_Unit'].sum()
+
+print(f"  ✓ 奖牌记录 {medal_rows} 条，团体项目去重后奖牌单位 {medal_units} 个（合并了 {medal_rows - medal_units} 条重复）")
+print(f"  ✓ 参赛者记录全部保留: {len(athletes_df)} 条")
 
 # ============== 保存清洗后的数据 ==============
 print("\n[Step 6] 保存清洗后的数据...")
 
-athletes_dedup.to_csv('summerOly_athletes_cleaned.csv', index=False, encoding='utf-8')
+athletes_df.to_csv('summerOly_athletes_cleaned.csv', index=False, encoding='utf-8')
 medal_counts_df.to_csv('summerOly_medal_counts_cleaned.csv', index=False, encoding='utf-8')
 hosts_df.to_csv('summerOly_hosts_cleaned.csv', index=False, encoding='utf-8')
 programs_df.to_csv('summerOly_programs_cleaned.csv', index=False, encoding='utf-8')
@@ -165,15 +177,15 @@ print("  - VNM → VIE")
 print("  - YAR/YMD (1990年后) → YEM")
 print("  - FRG/GDR (1990年后) → GER")
 print("✓ 删除了不讨论的国家数据(17个国家)")
-print("✓ 去除了团体项目的重复计数")
+print("✓ 标记了团体项目的奖牌单位 (Is_Medal_Unit)，参赛者记录完整保留")
 
 print("\n【参赛国家总数】")
-unique_countries = athletes_dedup['NOC'].unique()
+unique_countries = athletes_df['NOC'].unique()
 print(f"总共 {len(unique_countries)} 个国家/地区参赛")
 print(f"参赛国家代码: {sorted(unique_countries)}")
 
 print("\n【年份覆盖范围】")
-years = sorted(athletes_dedup['Year'].unique())
+years = sorted(athletes_df['Year'].unique())
 print(f"奥运会年份范围: {years[0]} - {years[-1]} ({len(years)}届)")
 
 print("\n数据清洗完成! ✓")
@@ -0,0 +1,173 @@
+import io
+import os
+
+import pandas as pd
+from normalize_inputs import canonical_path, read_text
+
+# 统一的紧凑数据类型定义
+# 以 data_dictionary.csv 为种子：示例值为数字的变量用 int32，其余文本变量用 category；
+# 字典未覆盖的列（清洗/特征阶段新增的列）在 SCHEMA_OVERRIDES 中补充。
+# 计数列（奖牌数、人数、项目数）统一用 int32：数据规模放大 10×/100× 时 int16/int8 会静默溢出回绕；
+# 只有取值范围与数据规模无关的 Year 用 int16。
+# 用法:
+#   from data_schema import load_table
+#   athletes_df = load_table('athletes')
+#   python data_schema.py    # 输出各表内存节省报告
+
+DICTIONARY_FILE = 'data_dictionary.csv'
+
+# 表名 -> (文件, data_dictionary.csv 中的章节名)
+TABLES = {
+    'athletes': ('summerOly_athletes_cleaned.csv', 'summerOly_athletes.csv'),
+    'medal_counts': ('summerOly_medal_counts_cleaned.csv', 'summerOly_medal_counts.csv'),
+    'hosts': ('summerOly_hosts_cleaned.csv', 'summerOly_hosts.csv'),
+    'programs': ('summerOly_programs_cleaned.csv', 'summerOly_programs.csv'),
+    'features': ('country_year_features.csv', None),
+}
+
+SCHEMA_OVERRIDES = {
+    'athletes': {
+        'Year': 'int16',
+        'Is_Medal_Unit': 'bool',
+    },
+    'medal_counts': {
+        'Year': 'int16',
+    },
+    'hosts': {
+        'Year': 'int16',
+        'Host': 'str',  # 每年一行，取值不重复，用 category 没有收益
+    },
+    'programs': {
+        # 字典中的 Year 指宽表中的年份列（含 "•" 等非数字标记），保持读取时的类型
+        'Year': None,
+        'Discipline': 'str',  # 每个项目一行，取值基本不重复
+        'Code': 'str',
+        'Sports Governing Body': 'category',
+    },
+    'features': {
+        'NOC': 'category',
+        'Year': 'int16',
+        'Gold_Medals': 'int32',
+        'Silver_Medals': 'int32',
+        'Bronze_Medals': 'int32',
+        'Total_Medals': 'int32',
+        'Lag_1_Gold': 'float32',
+        'Lag_1_Total': 'float32',
+        'Lag_2_Gold': 'float32',
+        'Lag_2_Total': 'float32',
+        'Lag_3_Gold': 'float32',
+        'Lag_3_Total': 'float32',
+        'Avg_3yr_Gold': 'float32',
+        'Avg_3yr_Total': 'float32',
+        'Is_Host': 'bool',
+        'Athlete_Count': 'int32',
+        'Female_Athletes': 'int32',
+        'Female_Ratio': 'float32',
+        'Sport_Count': 'int32',
+        'Event_Count': 'int32',
+        'Total_Gold_in_Olympics': 'float32',
+        'Avg_Sport_Efficiency': 'float32',
+        'Returning_Athletes': 'int32',
+        'Returning_Medalists': 'int32',
+        'Experienced_Share': 'float32',
+        'Avg_Prior_Editions': 'float32',
+    },
+}
+
+
+def parse_data_dictionary(path=DICTIONARY_FILE):
+    """解析 data_dictionary.csv，返回 {章节名: {变量名: 示例值}}。
+
+    优先读取 normalize_inputs.py 生成的规范文件；尚未生成时按检测到的编码读取原始文件。"""
+    if os.path.exists(canonical_path(path)):
+        with open(canonical_path(path), 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text, _, _ = read_text(path)
+    raw = pd.read_csv(io.StringIO(text), header=None, names=['variable', 'explanation', 'example'],
+                      dtype=str, keep_default_na=False)
+    sections = {}
+    current = None
+    in_variables = False
+    for variable, _, example in raw.itertuples(index=False):
+        variable = variable.strip()
+        if variable.endswith('.csv'):
+            current = sections.setdefault(variable, {})
+            in_variables = False
+        elif variable == 'variables':
+            in_variables = current is not None
+        elif not variable or not example.strip():
+            # 空行或没有示例值的说明性文字，变量定义区结束
+            in_variables = False
+        elif in_variables:
+            current[variable] = example.strip()
+    return sections
+
+
+def infer_dtype(example):
+    """示例值全为整数（如 "0, 1, 2"）时取 int32，否则视为分类变量。"""
+    tokens = [token.strip() for token in example.split(',') if token.strip()]
+    if tokens and all(token.lstrip('-').isdigit() for token in tokens):
+        return 'int32'
+    return 'category'
+
+
+def build_schema(table, dictionary=None):
+    """返回某张表的 {列名: dtype}，可直接传给 pd.read_csv(dtype=...)。"""
+    _, section = TABLES[table]
+    dtypes = {}
+    if section is not None:
+        if dictionary is None:
+            dictionary = parse_data_dictionary()
+        dtypes = {variable: infer_dtype(example) for variable, example in dictionary.get(section, {}).items()}
+    dtypes.update(SCHEMA_OVERRIDES.get(table, {}))
+    return {column: dtype for column, dtype in dtypes.items() if dtype is not None}
+
+
+def load_table(table, path=None, dictionary=None, **kwargs):
+    """按统一schema读取表；path 缺省时使用 TABLES 中的默认文件。"""
+    default_path, _ = TABLES[table]
+    schema = build_schema(table, dictionary)
+    return pd.read_csv(path or default_path, dtype=schema, encoding='utf-8', **kwargs)
+
+
+def memory_report(tables=None):
+    """对比默认 dtype 与统一 schema 下各表的内存占用（deep）。"""
+    dictionary = parse_data_dictionary()
+    rows = []
+    for table in tables or TABLES:
+        path, _ = TABLES[table]
+        try:
+            default_df = pd.read_csv(path, encoding='utf-8')
+        except FileNotFoundError:
+            continue
+        typed_df = load_table(table, dictionary=dictionary)
+        before = default_df.memory_usage(deep=True).sum()
+        after = typed_df.memory_usage(deep=True).sum()
+        rows.append({
+            'Table': table,
+            'Rows': len(typed_df),
+            'Default_MB': before / 1024 ** 2,
+            'Typed_MB': after / 1024 ** 2,
+            'Reduction': before / after,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("统一数据类型 Schema 与内存占用报告")
+    print("=" * 80)
+
+    dictionary = parse_data_dictionary()
+    print("\n【各表 Schema】")
+    for table in TABLES:
+        schema = build_schema(table, dictionary)
+        print(f"  {table}: {schema}")
+
+    print("\n【内存占用对比】")
+    report = memory_report()
+    print(report.round(3).to_string(index=False))
+
+    print("\nSchema 检查完成! ✓")
+    print("=" * 80)
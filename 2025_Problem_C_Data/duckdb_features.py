@@ -0,0 +1,280 @@
+import sys
+import os
+import time
+import subprocess
+
+import pandas as pd
+import numpy as np
+
+# 可选的嵌入式 SQL 后端：用一个 DuckDB 查询计划生成 country_year_features
+# 与 complete_data_processing.py 的 pandas 路径逐列对应（奖牌、滞后、东道主、运动员、项目、效率、经验特征），
+# 由 DuckDB 多线程执行，内存不足时溢写到本地临时目录，不需要任何数据库服务。
+# 用法:
+#   python duckdb_features.py            # 生成 country_year_features.csv
+#   python duckdb_features.py --check    # 与 pandas 路径做一致性校验并比较耗时（不一致时退出码为1）
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+DATABASE_FILE = 'olympics.duckdb'
+TEMP_DIRECTORY = 'duckdb_tmp'
+OUTPUT_FILE = 'country_year_features.csv'
+
+# 与 complete_data_processing.py 保持一致
+SPECIAL_MAPPINGS = {
+    'United States': 'USA',
+    'Great Britain': 'GBR',
+    'Soviet Union': 'URS',
+    'Germany': 'GER',
+    'East Germany': 'GDR',
+    'West Germany': 'FRG',
+    'China': 'CHN',
+    'Japan': 'JPN',
+    'South Korea': 'KOR',
+    'North Korea': 'PRK',
+    'Russia': 'RUS',
+}
+
+KNOWN_HOSTS = {
+    1896: 'GRE', 1900: 'FRA', 1904: 'USA', 1908: 'GBR', 1912: 'SWE',
+    1920: 'BEL', 1924: 'FRA', 1928: 'NED', 1932: 'USA', 1936: 'GER',
+    1948: 'GBR', 1952: 'FIN', 1956: 'AUS', 1960: 'ITA', 1964: 'JPN',
+    1968: 'MEX', 1972: 'GER', 1976: 'CAN', 1980: 'URS', 1984: 'USA',
+    1988: 'KOR', 1992: 'ESP', 1996: 'USA', 2000: 'AUS', 2004: 'GRE',
+    2008: 'CHN', 2012: 'GBR', 2016: 'BRA', 2020: 'JPN', 2024: 'FRA',
+}
+
+FEATURES_SQL = """
+CREATE OR REPLACE TABLE country_year_features AS
+WITH athletes AS (
+    SELECT *, row_number() OVER () AS rn FROM {athletes}
+),
+medal_counts AS (
+    SELECT * FROM {medal_counts}
+),
+-- 国家名称 -> 代码：drop_duplicates(['Team', 'NOC']) 后 to_dict()，同一 Team 以最后出现的组合为准
+team_pairs AS (
+    SELECT Team, NOC, min(rn) AS pair_rn FROM athletes WHERE Team IS NOT NULL GROUP BY Team, NOC
+),
+team_map AS (
+    SELECT Team, arg_max(NOC, pair_rn) AS NOC, min(pair_rn) AS team_rn FROM team_pairs GROUP BY Team
+),
+name_map AS (
+    SELECT t.Team AS name, COALESCE(s.code, t.NOC) AS code, t.team_rn AS ord
+    FROM team_map t LEFT JOIN special_mappings s ON s.name = t.Team
+    UNION ALL
+    SELECT s.name, s.code, 1e18 + s.ord FROM special_mappings s
+    WHERE s.name NOT IN (SELECT Team FROM team_map)
+),
+name_map_ci AS (
+    SELECT lower(name) AS lname, arg_min(code, ord) AS code FROM name_map GROUP BY lower(name)
+),
+medals AS (
+    SELECT COALESCE(e.code,
+                    CASE WHEN length(m.NOC) = 3 AND upper(m.NOC) = m.NOC THEN m.NOC END,
+                    ci.code,
+                    m.NOC) AS NOC,
+           m.Year, m.Gold, m.Silver, m.Bronze, m.Total
+    FROM medal_counts m
+    LEFT JOIN name_map e ON e.name = m.NOC
+    LEFT JOIN name_map_ci ci ON ci.lname = lower(m.NOC)
+),
+-- 国家-年份完整网格
+years AS (SELECT DISTINCT Year FROM athletes WHERE Year IS NOT NULL),
+countries AS (
+    SELECT NOC FROM athletes WHERE NOC IS NOT NULL
+    UNION
+    SELECT NOC FROM medals WHERE NOC IS NOT NULL
+),
+medal_features AS (
+    SELECT NOC, Year, sum(Gold) AS Gold_Medals, sum(Silver) AS Silver_Medals,
+           sum(Bronze) AS Bronze_Medals, sum(Total) AS Total_Medals
+    FROM medals GROUP BY NOC, Year
+),
+base AS (
+    SELECT c.NOC, y.Year,
+           COALESCE(m.Gold_Medals, 0) AS Gold_Medals, COALESCE(m.Silver_Medals, 0) AS Silver_Medals,
+           COALESCE(m.Bronze_Medals, 0) AS Bronze_Medals, COALESCE(m.Total_Medals, 0) AS Total_Medals
+    FROM countries c CROSS JOIN years y
+    LEFT JOIN medal_features m ON m.NOC = c.NOC AND m.Year = y.Year
+),
+lagged AS (
+    SELECT *,
+           lag(Gold_Medals, 1) OVER w::DOUBLE AS Lag_1_Gold, lag(Total_Medals, 1) OVER w::DOUBLE AS Lag_1_Total,
+           lag(Gold_Medals, 2) OVER w::DOUBLE AS Lag_2_Gold, lag(Total_Medals, 2) OVER w::DOUBLE AS Lag_2_Total,
+           lag(Gold_Medals, 3) OVER w::DOUBLE AS Lag_3_Gold, lag(Total_Medals, 3) OVER w::DOUBLE AS Lag_3_Total
+    FROM base WINDOW w AS (PARTITION BY NOC ORDER BY Year)
+),
+-- 与 pandas 路径一致：shift(1) 按国家分组，但 rolling(3) 作用在整张按 (NOC, Year) 排序的表上
+rolled AS (
+    SELECT *, avg(Lag_1_Gold) OVER r AS Avg_3yr_Gold, avg(Lag_1_Total) OVER r AS Avg_3yr_Total
+    FROM lagged WINDOW r AS (ORDER BY NOC, Year ROWS BETWEEN 2 PRECEDING AND CURRENT ROW)
+),
+-- 参赛者视图：同一 (NOC, Year, Name) 只保留首次出现的记录
+roster AS (
+    SELECT DISTINCT ON (NOC, Year, Name) NOC, Year, Name, Sex
+    FROM athletes WHERE NOC IS NOT NULL ORDER BY NOC, Year, Name, rn
+),
+athlete_features AS (
+    SELECT NOC, Year, count(Name) AS Athlete_Count, COALESCE(sum((Sex = 'F')::INTEGER), 0) AS Female_Athletes
+    FROM roster GROUP BY NOC, Year
+),
+sport_coverage AS (
+    SELECT NOC, Year, count(DISTINCT Sport) AS Sport_Count, count(DISTINCT Event) AS Event_Count
+    FROM athletes WHERE NOC IS NOT NULL GROUP BY NOC, Year
+),
+total_gold AS (
+    SELECT Year, sum(Gold) AS Total_Gold_in_Olympics FROM medal_counts GROUP BY Year
+),
+-- 项目效率：奖牌单位 / 不重复运动员数
+medal_by_sport AS (
+    SELECT NOC, Year, Sport, count(*) AS Sport_Medals FROM athletes
+    WHERE Is_Medal_Unit AND NOC IS NOT NULL AND Sport IS NOT NULL GROUP BY NOC, Year, Sport
+),
+athlete_by_sport AS (
+    SELECT NOC, Year, Sport, count(*) AS Sport_Athletes
+    FROM (SELECT DISTINCT NOC, Year, Sport, Name FROM athletes WHERE NOC IS NOT NULL AND Sport IS NOT NULL)
+    GROUP BY NOC, Year, Sport
+),
+efficiency AS (
+    SELECT m.NOC, m.Year, avg(m.Sport_Medals / greatest(a.Sport_Athletes, 1)) AS Avg_Sport_Efficiency
+    FROM medal_by_sport m LEFT JOIN athlete_by_sport a USING (NOC, Year, Sport)
+    GROUP BY m.NOC, m.Year
+),
+-- 运动员经验特征：按 (Name, Sex, NOC) 识别同一运动员
+editions AS (
+    SELECT Name, Sex, NOC, Year, sum((Medal IS DISTINCT FROM 'No medal')::INTEGER) AS medals
+    FROM athletes GROUP BY Name, Sex, NOC, Year
+),
+career AS (
+    SELECT NOC, Year,
+           row_number() OVER p - 1 AS prior_editions,
+           sum(medals) OVER p - medals AS prior_medals
+    FROM editions WINDOW p AS (PARTITION BY Name, Sex, NOC ORDER BY Year ROWS UNBOUNDED PRECEDING)
+),
+career_features AS (
+    SELECT NOC, Year,
+           sum((prior_editions > 0)::INTEGER) AS Returning_Athletes,
+           sum((prior_medals > 0)::INTEGER) AS Returning_Medalists,
+           avg((prior_editions > 0)::DOUBLE) AS Experienced_Share,
+           avg(prior_editions) AS Avg_Prior_Editions
+    FROM career WHERE NOC IS NOT NULL GROUP BY NOC, Year
+)
+SELECT r.NOC, r.Year,
+       r.Gold_Medals, r.Silver_Medals, r.Bronze_Medals, r.Total_Medals,
+       r.Lag_1_Gold, r.Lag_1_Total, r.Lag_2_Gold, r.Lag_2_Total, r.Lag_3_Gold, r.Lag_3_Total,
+       r.Avg_3yr_Gold, r.Avg_3yr_Total,
+       (h.NOC IS NOT NULL)::INTEGER AS Is_Host,
+       COALESCE(a.Athlete_Count, 0) AS Athlete_Count,
+       COALESCE(a.Female_Athletes, 0) AS Female_Athletes,
+       COALESCE(a.Female_Athletes / greatest(a.Athlete_Count, 1), 0) AS Female_Ratio,
+       COALESCE(s.Sport_Count, 0) AS Sport_Count,
+       COALESCE(s.Event_Count, 0) AS Event_Count,
+       COALESCE(g.Total_Gold_in_Olympics, 0)::DOUBLE AS Total_Gold_in_Olympics,
+       COALESCE(e.Avg_Sport_Efficiency, 0) AS Avg_Sport_Efficiency,
+       COALESCE(c.Returning_Athletes, 0) AS Returning_Athletes,
+       COALESCE(c.Returning_Medalists, 0) AS Returning_Medalists,
+       COALESCE(c.Experienced_Share, 0) AS Experienced_Share,
+       COALESCE(c.Avg_Prior_Editions, 0) AS Avg_Prior_Editions
+FROM rolled r
+LEFT JOIN known_hosts h ON h.Year = r.Year AND h.NOC = r.NOC
+LEFT JOIN athlete_features a ON a.NOC = r.NOC AND a.Year = r.Year
+LEFT JOIN sport_coverage s ON s.NOC = r.NOC AND s.Year = r.Year
+LEFT JOIN total_gold g ON g.Year = r.Year
+LEFT JOIN efficiency e ON e.NOC = r.NOC AND e.Year = r.Year
+LEFT JOIN career_features c ON c.NOC = r.NOC AND c.Year = r.Year
+ORDER BY r.NOC, r.Year
+"""
+
+
+def table_source(stem):
+    """优先读取清洗后的 Parquet 文件，没有则读取 CSV。"""
+    if os.path.exists(f'{stem}.parquet'):
+        return f"read_parquet('{stem}.parquet')"
+    return f"read_csv('{stem}.csv', header=true)"
+
+
+def build_features_duckdb(database=DATABASE_FILE, threads=None):
+    """在本地 DuckDB 文件中执行特征查询，返回 country_year_features DataFrame。"""
+    if duckdb is None:
+        raise ImportError("需要安装 duckdb: pip install duckdb")
+
+    con = duckdb.connect(database)
+    try:
+        con.execute(f"SET threads TO {threads or os.cpu_count()}")
+        con.execute(f"SET temp_directory = '{TEMP_DIRECTORY}'")  # 超出内存时溢写到磁盘
+
+        special = pd.DataFrame({
+            'name': list(SPECIAL_MAPPINGS.keys()),
+            'code': list(SPECIAL_MAPPINGS.values()),
+            'ord': np.arange(len(SPECIAL_MAPPINGS)),
+        })
+        hosts = pd.DataFrame({'Year': list(KNOWN_HOSTS.keys()), 'NOC': list(KNOWN_HOSTS.values())})
+        con.register('special_mappings', special)
+        con.register('known_hosts', hosts)
+
+        con.execute(FEATURES_SQL.format(
+            athletes=table_source('summerOly_athletes_cleaned'),
+            medal_counts=table_source('summerOly_medal_counts_cleaned'),
+        ))
+        return con.execute("SELECT * FROM country_year_features").df()
+    finally:
+        con.close()
+
+
+def assert_same_features(pandas_df, duck_df):
+    """逐列比较两条路径的特征表，不一致时抛出 AssertionError（整数/浮点类型差异不计）。"""
+    pd.testing.assert_frame_equal(
+        pandas_df.reset_index(drop=True),
+        duck_df.reset_index(drop=True),
+        check_dtype=False,
+        rtol=1e-9,
+    )
+
+
+def run_pandas_path():
+    """运行 pandas 路径（complete_data_processing.py），返回其输出与耗时。"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, 'complete_data_processing.py'], check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    return pd.read_csv(OUTPUT_FILE), elapsed
+
+
+if __name__ == '__main__':
+    check = '--check' in sys.argv[1:]
+
+    print("=" * 80)
+    print("DuckDB 后端：特征构建")
+    print("=" * 80)
+
+    if check:
+        print("\n[Step 1] 运行 pandas 路径 (complete_data_processing.py)...")
+        pandas_df, pandas_time = run_pandas_path()
+        print(f"  ✓ pandas 路径用时 {pandas_time:.2f} 秒")
+
+    print(f"\n[Step {2 if check else 1}] 执行 DuckDB 查询...")
+    start = time.perf_counter()
+    duck_df = build_features_duckdb()
+    duck_time = time.perf_counter() - start
+    print(f"  ✓ {len(duck_df)} 行 × {len(duck_df.columns)} 列，用时 {duck_time:.2f} 秒")
+
+    if not check:
+        duck_df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8')
+        print(f"  ✓ 已保存: {OUTPUT_FILE}")
+        print("\n特征构建完成! ✓")
+        print("=" * 80)
+        sys.exit(0)
+
+    print("\n[Step 3] 一致性校验...")
+    try:
+        assert_same_features(pandas_df, duck_df)
+    except AssertionError as exc:
+        print(f"  ✗ 与 pandas 路径不一致:\n{exc}")
+        sys.exit(1)
+
+    print("  ✓ 与 pandas 路径完全一致")
+    print(f"\n【耗时对比】pandas: {pandas_time:.2f} 秒 / DuckDB: {duck_time:.2f} 秒 "
+          f"(加速 {pandas_time / duck_time:.1f}x)")
+    print("=" * 80)
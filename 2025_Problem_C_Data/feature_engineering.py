@@ -1,16 +1,19 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from athlete_index import build_athlete_index, returning_athlete_features
+from data_schema import load_table
 
 print("=" * 80)
 print("特征提取与工程处理")
 print("=" * 80)
 
 # ============== 读取清洗后的数据 ==============
-athletes_df = pd.read_csv('summerOly_athletes_cleaned.csv', encoding='utf-8-sig')
-medal_counts_df = pd.read_csv('summerOly_medal_counts_cleaned.csv', encoding='utf-8-sig')
-hosts_df = pd.read_csv('summerOly_hosts_cleaned.csv', encoding='utf-8-sig')
-programs_df = pd.read_csv('summerOly_programs_cleaned.csv', encoding='utf-8-sig')
+# 统一使用 data_schema 中的紧凑类型（category / int16 / int32 / bool）
+athletes_df = load_table('athletes')
+medal_counts_df = load_table('medal_counts')
+hosts_df = load_table('hosts')
+programs_df = load_table('programs')
 
 print("\n[Step 1] 构建国家-年份基础表...")
 
@@ -30,7 +33,7 @@ print(f"  ✓ 构建了 {len(country_year_df)} 个(NOC, Year)组合")
 print("\n[Step 2] 添加历史奖牌数特征...")
 
 # 从medal_counts_df中计算各国各年的奖牌数
-medal_features = medal_counts_df.groupby(['NOC', 'Year']).agg({
+medal_features = medal_counts_df.groupby(['NOC', 'Year'], observed=True).agg({
     'Gold': 'sum',
     'Silver': 'sum', 
     'Bronze': 'sum',
@@ -127,8 +130,10 @@ print(f"  ✓ 识别了 {country_year_df['Is_Host'].sum()} 个主办国记录")
 print("\n[Step 4] 添加运动员投入特征...")
 
 # 计算各国各年的运动员数和女性比例
-athlete_features = athletes_df.groupby(['NOC', 'Year']).agg({
-    'Name': 'count',  # 总运动员数（去重后）
+# 参赛者视图：同一运动员参加多个项目只计一次
+athlete_roster = athletes_df.drop_duplicates(subset=['NOC', 'Year', 'Name'])
+athlete_features = athlete_roster.groupby(['NOC', 'Year'], observed=True).agg({
+    'Name': 'count',  # 不重复运动员数
     'Sex': lambda x: (x == 'F').sum()  # 女性数量
 }).reset_index().rename(columns={
     'Name': 'Athlete_Count',
@@ -150,7 +155,7 @@ print("  ✓ 添加了运动员数量和性别比例特征")
 print("\n[Step 5] 添加项目覆盖度特征...")
 
 # 计算各国各年参加的项目数
-sport_coverage = athletes_df.groupby(['NOC', 'Year']).agg({
+sport_coverage = athletes_df.groupby(['NOC', 'Year'], observed=True).agg({
     'Sport': 'nunique',  # 不同运动种类数
     'Event': 'nunique'   # 不同项目数
 }).reset_index().rename(columns={
@@ -180,13 +185,16 @@ print("  ✓ 添加了当年全球总金牌数特征")
 print("\n[Step 7] 计算项目效率特征...")
 
 # 计算各国在各项目的奖牌效率（奖牌数/参赛人数）
-athletes_with_medals = athletes_df[athletes_df['Medal'] != 'No medal'].copy()
+# 分子用奖牌单位视图（团体奖牌只计一次），分母用参赛者视图中的不重复运动员数
+athletes_with_medals = athletes_df[athletes_df['Is_Medal_Unit']].copy()
 
-medal_by_country_sport = athletes_with_medals.groupby(['NOC', 'Year', 'Sport']).agg({
+medal_by_country_sport = athletes_with_medals.groupby(['NOC', 'Year', 'Sport'], observed=True).agg({
     'Medal': 'count'
 }).reset_index().rename(columns={'Medal': 'Sport_Medals'})
 
-athlete_by_country_sport = athletes_df.groupby(['NOC', 'Year', 'Sport']).size().reset_index(name='Sport_Athletes')
+athlete_by_country_sport = athletes_df.drop_duplicates(subset=['NOC', 'Year', 'Sport', 'Name']).groupby(
+    ['NOC', 'Year', 'Sport'], observed=True
+).size().reset_index(name='Sport_Athletes')
 
 sport_efficiency = medal_by_country_sport.merge(
     athlete_by_country_sport, 
@@ -197,7 +205,7 @@ sport_efficiency = medal_by_country_sport.merge(
 sport_efficiency['Sport_Efficiency'] = sport_efficiency['Sport_Medals'] / sport_efficiency['Sport_Athletes']
 
 # 计算每个国家每年的平均效率
-avg_sport_efficiency = sport_efficiency.groupby(['NOC', 'Year'])['Sport_Efficiency'].mean().reset_index().rename(
+avg_sport_efficiency = sport_efficiency.groupby(['NOC', 'Year'], observed=True)['Sport_Efficiency'].mean().reset_index().rename(
     columns={'Sport_Efficiency': 'Avg_Sport_Efficiency'}
 )
 
@@ -206,8 +214,23 @@ country_year_df['Avg_Sport_Efficiency'] = country_year_df['Avg_Sport_Efficiency'
 
 print("  ✓ 添加了项目效率特征（用于教练效应分析）")
 
+# ============== 特征7：运动员经验特征 (Returning Athletes) ==============
+print("\n[Step 8] 添加运动员经验特征...")
+
+# 基于运动员ID索引的整数数组运算，避免对运动员表的字符串 groupby
+_, athlete_index = build_athlete_index(athletes_df)
+career_features = returning_athlete_features(athlete_index)
+
+country_year_df = country_year_df.merge(career_features, on=['NOC', 'Year'], how='left')
+for col in ['Returning_Athletes', 'Returning_Medalists', 'Experienced_Share', 'Avg_Prior_Editions']:
+    country_year_df[col] = country_year_df[col].fillna(0)
+country_year_df['Returning_Athletes'] = country_year_df['Returning_Athletes'].astype(int)
+country_year_df['Returning_Medalists'] = country_year_df['Returning_Medalists'].astype(int)
+
+print("  ✓ 添加了回归运动员/回归奖牌得主特征")
+
 # ============== 保存特征数据集 ==============
-print("\n[Step 8] 保存特征数据集...")
+print("\n[Step 9] 保存特征数据集...")
 
 country_year_df = country_year_df.sort_values(['NOC', 'Year']).reset_index(drop=True)
 country_year_df.to_csv('country_year_features.csv', index=False, encoding='utf-8')
@@ -244,6 +267,9 @@ print("  - Event_Count: 参赛项目总数")
 print("  - Total_Gold_in_Olympics: 当年奥运会总金牌数")
 print("\n教练效应相关特征:")
 print("  - Avg_Sport_Efficiency: 平均项目效率（奖牌数/参赛人数）")
+print("\n运动员经验特征:")
+print("  - Returning_Athletes / Returning_Medalists: 回归运动员数 / 回归奖牌得主数")
+print("  - Experienced_Share, Avg_Prior_Editions: 经验运动员占比 / 平均已参加届数")
 
 print("\n【缺失值统计】")
 missing_summary = country_year_df.isnull().sum()
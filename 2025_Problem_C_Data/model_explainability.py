@@ -0,0 +1,157 @@
+import time
+
+import pandas as pd
+import numpy as np
+import joblib
+from data_schema import load_table
+from country_similarity import fill_cold_start
+from joblib import Parallel, delayed
+
+# 可解释性阶段：置换重要性 + 部分依赖(PDP)/个体条件期望(ICE)
+# 依赖 modeling_strategy.py 保存的 model_artifacts.joblib（金牌/总奖牌 × 主/下界/上界 共6个模型）
+# 与基于不纯度的 feature_importances_ 不同，置换重要性不会偏向 Athlete_Count 这类高基数特征
+
+N_REPEATS = 10       # 每个特征的置换次数
+GRID_POINTS = 20     # PDP/ICE 网格点数上限
+RANDOM_STATE = 42
+N_JOBS = -1          # 跨特征并行
+
+
+def model_loss(y_true, pred, alpha=None):
+    """按行计算损失：pred 为 (重复次数, 样本数)。主模型用均方误差，分位数模型用 pinball 损失。"""
+    diff = y_true[np.newaxis, :] - pred
+    if alpha is None:
+        return np.mean(diff ** 2, axis=1)
+    return np.mean(np.maximum(alpha * diff, (alpha - 1) * diff), axis=1)
+
+
+def permutation_importance_batched(model, X, y, col, alpha, n_repeats, seed, columns):
+    """对单个特征做 n_repeats 次置换，堆叠成一个矩阵后只调用一次 predict。"""
+    n = X.shape[0]
+    rng = np.random.default_rng(seed)
+    X_perm = np.tile(X, (n_repeats, 1))
+    X_perm[:, col] = np.concatenate([rng.permutation(X[:, col]) for _ in range(n_repeats)])
+    pred = model.predict(pd.DataFrame(X_perm, columns=columns)).reshape(n_repeats, n)
+    return model_loss(y, pred, alpha)
+
+
+def feature_grid(values, grid_points):
+    """离散特征（如 Is_Host）直接用全部取值，连续特征取 5%-95% 分位点。"""
+    unique = np.unique(values)
+    if len(unique) <= grid_points:
+        return unique
+    return np.unique(np.quantile(values, np.linspace(0.05, 0.95, grid_points)))
+
+
+def partial_dependence_batched(model, X, col, grid, columns):
+    """把所有网格点的数据副本拼接后一次性预测，返回 ICE 矩阵 (网格点数, 样本数)。"""
+    n = X.shape[0]
+    X_grid = np.tile(X, (len(grid), 1))
+    X_grid[:, col] = np.repeat(grid, n)
+    return model.predict(pd.DataFrame(X_grid, columns=columns)).reshape(len(grid), n)
+
+
+def explain_feature(target, model_name, model, X, y, col, alpha, grid, columns):
+    perm_loss = permutation_importance_batched(model, X, y, col, alpha, N_REPEATS, RANDOM_STATE + col, columns)
+    ice = partial_dependence_batched(model, X, col, grid, columns)
+    return target, model_name, col, perm_loss, ice
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("模型可解释性分析：置换重要性 + 部分依赖/ICE")
+    print("=" * 80)
+
+    # ============== 第1步：加载模型与验证集 ==============
+    print("\n[Step 1] 加载模型与验证数据...")
+
+    artifacts = joblib.load('model_artifacts.joblib')
+    features = artifacts['features']
+    val_year = artifacts['val_year']
+    quantiles = artifacts['quantiles']
+
+    df, _ = fill_cold_start(load_table('features'), load_table('programs'))  # 与训练时的特征处理一致
+    val_df = df[df['Year'] == val_year].reset_index(drop=True)
+    X_val = val_df[features].fillna(0).to_numpy(dtype=float)
+    nocs = val_df['NOC'].to_numpy()
+
+    print(f"  ✓ 特征数: {len(features)}，验证样本: {len(X_val)} ({val_year}年)")
+
+    # ============== 第2步：并行计算 ==============
+    print("\n[Step 2] 并行计算置换重要性与 PDP/ICE...")
+
+    start = time.perf_counter()
+    grids = [feature_grid(X_val[:, col], GRID_POINTS) for col in range(len(features))]
+
+    tasks = []
+    baseline = {}
+    for target, models in artifacts['models'].items():
+        y_val = val_df[target].to_numpy(dtype=float)
+        for model_name, model in models.items():
+            alpha = quantiles.get(model_name)
+            baseline[(target, model_name)] = model_loss(y_val, model.predict(val_df[features].fillna(0))[np.newaxis, :], alpha)[0]
+            for col in range(len(features)):
+                tasks.append(delayed(explain_feature)(target, model_name, model, X_val, y_val, col, alpha, grids[col], features))
+
+    results = Parallel(n_jobs=N_JOBS)(tasks)
+    elapsed = time.perf_counter() - start
+    print(f"  ✓ 完成 {len(tasks)} 个(目标, 模型, 特征)任务，用时 {elapsed:.2f} 秒")
+
+    # ============== 第3步：整理结果 ==============
+    print("\n[Step 3] 整理并保存结果...")
+
+    importance_rows = []
+    pd_frames = []
+    ice_frames = []
+    for target, model_name, col, perm_loss, ice in results:
+        base = baseline[(target, model_name)]
+        importance_rows.append({
+            'Target': target,
+            'Model': model_name,
+            'Feature': features[col],
+            'Baseline_Loss': base,
+            'Importance_Mean': (perm_loss - base).mean(),
+            'Importance_Std': (perm_loss - base).std(),
+        })
+        grid = grids[col]
+        pd_frames.append(pd.DataFrame({
+            'Target': target,
+            'Model': model_name,
+            'Feature': features[col],
+            'Grid_Value': grid,
+            'Partial_Dependence': ice.mean(axis=1),
+        }))
+        ice_frames.append(pd.DataFrame({
+            'Target': target,
+            'Model': model_name,
+            'Feature': features[col],
+            'NOC': np.tile(nocs, len(grid)),
+            'Grid_Value': np.repeat(grid, len(nocs)),
+            'Prediction': ice.ravel(),
+        }))
+
+    importance_df = pd.DataFrame(importance_rows).sort_values(
+        ['Target', 'Model', 'Importance_Mean'], ascending=[True, True, False]
+    )
+    pd_df = pd.concat(pd_frames, ignore_index=True)
+    ice_df = pd.concat(ice_frames, ignore_index=True)
+
+    importance_df.to_csv('explain_permutation_importance.csv', index=False, encoding='utf-8')
+    pd_df.to_csv('explain_partial_dependence.csv', index=False, encoding='utf-8')
+    ice_df.to_csv('explain_ice_curves.csv', index=False, encoding='utf-8')
+
+    print("  ✓ explain_permutation_importance.csv")
+    print("  ✓ explain_partial_dependence.csv")
+    print(f"  ✓ explain_ice_curves.csv ({len(ice_df)} 行)")
+
+    print("\n  图表由 report_rendering.py 基于以上CSV渲染")
+
+    # ============== 报告 ==============
+    print("\n" + "=" * 80)
+    print("置换重要性 Top 5（金牌主模型）")
+    print("=" * 80)
+    top = importance_df[(importance_df['Target'] == 'Gold_Medals') & (importance_df['Model'] == 'main')].head(5)
+    print(top[['Feature', 'Importance_Mean', 'Importance_Std']].round(3).to_string(index=False))
+
+    print("\n可解释性分析完成! ✓")
+    print("=" * 80)
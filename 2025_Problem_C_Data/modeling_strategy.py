@@ -1,21 +1,21 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from data_schema import load_table
+from country_similarity import fill_cold_start
+import joblib
 from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
 
-# 设置绘图风格，支持中文显示（如果环境支持）
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial']  # 尝试使用中文字体
-plt.rcParams['axes.unicode_minus'] = False
-sns.set_style("whitegrid")
-
 print("=" * 80)
 print("开始执行建模策略：基于机器学习的回归预测与不确定性量化")
 print("=" * 80)
 
 # 1. 加载数据
-df = pd.read_csv('country_year_features.csv')
+df = load_table('features')
+
+# 冷启动：当年参赛但此前未参赛的国家，滞后特征借用相似国家的同年数值，而不是当作零奖牌国家
+df, n_cold_start = fill_cold_start(df, load_table('programs'))
+print(f"\n[冷启动填补] 借用相似国家轨迹填补了 {n_cold_start} 个滞后特征单元格")
 
 # 2. 数据准备
 # 我们使用“滑动窗口”逻辑：
@@ -25,7 +25,7 @@ df = pd.read_csv('country_year_features.csv')
 train_df = df[(df['Year'] >= 1996) & (df['Year'] <= 2020)].copy()
 val_df = df[df['Year'] == 2024].copy()
 
-# 处理缺失值：Lag特征如果没有（说明之前没参加），填0是合理的
+# 处理缺失值：冷启动国家已由相似国家填补，其余缺失（如网格起始年份）填0
 features = [
     'Lag_1_Total', 'Lag_1_Gold',        # 核心趋势
     'Lag_2_Total',                      # 长期趋势
@@ -100,11 +100,24 @@ def train_and_predict(target_name, y_train, y_val):
     print(f"MAE (平均绝对误差): {mae:.2f} (平均每个国家预测偏离多少枚奖牌)")
     print(f"RMSE (均方根误差): {rmse:.2f} (对大误差更敏感的指标)")
     
-    return pred_main, pred_lower, pred_upper, model_main
+    models = {'main': model_main, 'lower': model_lower, 'upper': model_upper}
+    return pred_main, pred_lower, pred_upper, models
 
 # 执行预测
-pred_gold, lower_gold, upper_gold, model_gold = train_and_predict("金牌榜", y_train_gold, y_val_gold)
-pred_total, lower_total, upper_total, model_total = train_and_predict("奖牌总榜", y_train_total, y_val_total)
+pred_gold, lower_gold, upper_gold, models_gold = train_and_predict("金牌榜", y_train_gold, y_val_gold)
+pred_total, lower_total, upper_total, models_total = train_and_predict("奖牌总榜", y_train_total, y_val_total)
+model_gold = models_gold['main']
+model_total = models_total['main']
+
+# 持久化全部6个模型（主模型 + 上下分位数模型），供可解释性分析等后续阶段直接加载
+joblib.dump({
+    'features': features,
+    'train_years': (1996, 2020),
+    'val_year': 2024,
+    'quantiles': {'lower': 0.05, 'upper': 0.95},
+    'models': {'Gold_Medals': models_gold, 'Total_Medals': models_total},
+}, 'model_artifacts.joblib')
+print("\n  ✓ 已保存: model_artifacts.joblib (金牌/总奖牌 × 主/下界/上界 模型)")
 
 # 5. 结果整合与分析
 results_2024 = val_df[['NOC', 'Year', 'Gold_Medals', 'Total_Medals']].copy()
@@ -119,90 +132,15 @@ results_2024['Total_Upper'] = upper_total
 results_2024['Gold_Diff'] = results_2024['Pred_Gold'] - results_2024['Gold_Medals']
 results_2024['Total_Diff'] = results_2024['Pred_Total'] - results_2024['Total_Medals']
 
-# 6. 可视化
-print("\n[生成可视化图表...]")
-
-# 图1: 预测值 vs 真实值 (总奖牌)
-plt.figure(figsize=(10, 6))
-plt.scatter(results_2024['Total_Medals'], results_2024['Pred_Total'], alpha=0.6, color='blue')
-plt.plot([0, 140], [0, 140], 'r--', lw=2)  # 对角线
-plt.xlabel('Actual Total Medals (2024)')
-plt.ylabel('Predicted Total Medals (2024)')
-plt.title('Reference Line (Red) vs Prediction (Blue)')
-plt.grid(True)
-plt.savefig('model_eval_scatter.png')
-print("  ✓ 已保存: model_eval_scatter.png (散点图)")
-
-# 图2: 特征重要性 (使用金牌模型)
+# 6. 持久化预测结果
+# 图表与文本报告由 report_rendering.py 基于这些文件独立渲染，训练不再等待绘图
+results_2024.to_csv('2024_prediction_results.csv', index=False, encoding='utf-8')
 feature_imp = pd.Series(model_gold.feature_importances_, index=features).sort_values(ascending=False)
-plt.figure(figsize=(10, 6))
-sns.barplot(x=feature_imp.values, y=feature_imp.index, hue=feature_imp.index, palette='viridis', legend=False)
-plt.title('Feature Importance (Gold Medal Model)')
-plt.xlabel('Importance Score')
-plt.tight_layout()
-plt.savefig('model_feature_importance.png')
-print("  ✓ 已保存: model_feature_importance.png (特征重要性)")
-
-# 图3: 前15名国家预测对比
-top_countries = results_2024.sort_values('Total_Medals', ascending=False).head(15)
-plt.figure(figsize=(14, 7))
-x = np.arange(len(top_countries))
-width = 0.35
-
-plt.bar(x - width/2, top_countries['Total_Medals'], width, label='Actual', color='navy')
-# Calculate error bars with safety checks for non-negative values
-lower_diff = (top_countries['Pred_Total'] - top_countries['Total_Lower']).clip(lower=0)
-upper_diff = (top_countries['Total_Upper'] - top_countries['Pred_Total']).clip(lower=0)
-
-plt.bar(x + width/2, top_countries['Pred_Total'], width, label='Predicted', color='skyblue', yerr=[
-    lower_diff,
-    upper_diff
-], capsize=5)
-
-plt.xlabel('Country')
-plt.ylabel('Total Medals')
-plt.title('Top 15 Countries: Actual vs Predicted (2024) with 90% Confidence Interval')
-plt.xticks(x, top_countries['NOC'])
-plt.legend()
-plt.grid(axis='y', linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.savefig('model_top15_compare.png')
-print("  ✓ 已保存: model_top15_compare.png (前15强对比)")
-
-
-# 7. 详细输出重点关注数据
-print("\n" + "="*80)
-print("【2024年预测效果详解】 (按真实金牌数排序)")
-print("说明：Error = 预测值 - 真实值 (正数表示高估，负数表示低估)")
-print("="*80)
-
-# 选取重点关注的国家：金牌榜前10 + 东道主(FRA)
-top_gold_nocs = results_2024.sort_values('Gold_Medals', ascending=False).head(10)['NOC'].tolist()
-if 'FRA' not in top_gold_nocs:
-    top_gold_nocs.append('FRA')
-
-display_cols = ['NOC', 'Gold_Medals', 'Pred_Gold', 'Gold_Diff', 'Gold_Lower', 'Gold_Upper', 
-                'Total_Medals', 'Pred_Total', 'Total_Diff']
-
-subset = results_2024[results_2024['NOC'].isin(top_gold_nocs)].sort_values('Gold_Medals', ascending=False)
-report_str = subset[display_cols].round(1).to_string(index=False)
-print(report_str)
-
-# Save report to file
-with open('2024_prediction_report.txt', 'w', encoding='utf-8') as f:
-    f.write("="*80 + "\n")
-    f.write("【2024年预测效果详解】 (按真实金牌数排序)\n")
-    f.write("说明：Error = 预测值 - 真实值 (正数表示高估，负数表示低估)\n")
-    f.write("="*80 + "\n")
-    f.write(report_str + "\n\n")
-    f.write("【模型关键指标解读】\n")
-    f.write(f"1. 解释度 (R2): 金牌模型 {r2_score(y_val_gold, pred_gold):.3f} / 总奖牌模型 {r2_score(y_val_total, pred_total):.3f}\n")
-    f.write("   -> 超过0.9说明模型极好地捕捉了奖牌分布规律。\n")
-    f.write("2. 东道主效应捕捉 (FRA):\n")
-    fra_row = results_2024[results_2024['NOC'] == 'FRA'].iloc[0]
-    f.write(f"   - 真实: {fra_row['Gold_Medals']}金 / {fra_row['Total_Medals']}总\n")
-    f.write(f"   - 预测: {fra_row['Pred_Gold']:.1f}金 / {fra_row['Pred_Total']:.1f}总\n")
-    f.write(f"   - 评价: 预测{'高估' if fra_row['Gold_Diff'] > 0 else '低估'}了 {abs(fra_row['Gold_Diff']):.1f} 枚金牌\n")
-
-print("\n结果已保存至 2024_prediction_report.txt")
+feature_imp.rename_axis('Feature').reset_index(name='Importance').to_csv(
+    'model_feature_importance.csv', index=False, encoding='utf-8'
+)
+
+print("\n  ✓ 已保存: 2024_prediction_results.csv (预测结果)")
+print("  ✓ 已保存: model_feature_importance.csv (金牌模型特征重要性)")
+print("\n下一步: python report_rendering.py 生成图表与 2024_prediction_report.txt")
 print("\n完成。")
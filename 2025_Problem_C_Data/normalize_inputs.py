@@ -0,0 +1,155 @@
+import os
+import io
+import json
+import codecs
+import hashlib
+import tempfile
+
+import pandas as pd
+
+# 原始输入的一次性编码规范化
+# 原始文件编码不一：奖牌榜为 UTF-8，主办国表为带 BOM 的 UTF-8，赛事表与数据字典为 cp1252（含 • 和 – 等字符），
+# 而且多处用不间断空格 (NBSP) 做分隔，以 latin-1 读取会得到 "ï»¿Year"、"Â Athens" 这样的乱码，
+# 国家名称末尾残留的 NBSP 也会让名称到 NOC 代码的映射失配。
+# 这里对每个文件只检测一次编码与 BOM，按列做批量的 NFKC 规范化（NBSP 随之变为普通空格）、
+# 合并连续空白并去除首尾空白，写出 canonical/ 下的规范 UTF-8 文件和含校验和的 manifest.json。
+# 源文件未变化时直接复用已有结果；之后各阶段统一按 UTF-8 读取规范文件，不再各自处理编码。
+# 用法: python normalize_inputs.py [--force]
+
+CANONICAL_DIR = 'canonical'
+MANIFEST_FILE = os.path.join(CANONICAL_DIR, 'manifest.json')
+RAW_INPUTS = ['summerOly_athletes.csv', 'summerOly_medal_counts.csv', 'summerOly_hosts.csv',
+              'summerOly_programs.csv', 'data_dictionary.csv']
+
+BOMS = [(codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')]
+# 无 BOM 时依次尝试；cp1252 无法解码的少数字节最终由 latin-1 兜底
+CANDIDATE_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+
+
+def canonical_path(name):
+    return os.path.join(CANONICAL_DIR, os.path.basename(name))
+
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def detect_encoding(raw):
+    """返回 (编码, 是否带 BOM)。"""
+    for bom, encoding in BOMS:
+        if raw.startswith(bom):
+            return encoding, True
+    for encoding in CANDIDATE_ENCODINGS:
+        try:
+            raw.decode(encoding)
+            return encoding, False
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1', False
+
+
+def read_text(path):
+    """按检测到的编码把原始文件解码为文本，返回 (文本, 编码, 是否带 BOM)。"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    encoding, bom = detect_encoding(raw)
+    return raw.decode(encoding), encoding, bom
+
+
+def normalize_strings(series):
+    """NFKC 规范化（NBSP 等兼容字符变为普通空格），合并连续空白，去除首尾空白。"""
+    return series.str.normalize('NFKC').str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def normalize_file(path, output):
+    """规范化单个文件并原子写出，返回 manifest 条目。
+
+    所有单元格（含表头）按文本读取，保持原样的行列结构，只改动字符串内容。"""
+    text, encoding, bom = read_text(path)
+    table = pd.read_csv(io.StringIO(text), header=None, dtype=str, keep_default_na=False)
+    normalized = table.apply(normalize_strings)
+    changed = int((normalized != table).to_numpy().sum())
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(output), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+        normalized.to_csv(f, header=False, index=False, lineterminator='\n')
+    os.replace(tmp, output)
+
+    return {
+        'source_sha256': sha256(path),
+        'encoding': encoding,
+        'bom': bom,
+        'rows': len(table) - 1,
+        'columns': table.shape[1],
+        'changed_cells': changed,
+        'output': output,
+        'output_sha256': sha256(output),
+    }
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_current(entry, path):
+    output = entry.get('output', '')
+    return (os.path.exists(output) and entry.get('source_sha256') == sha256(path)
+            and entry.get('output_sha256') == sha256(output))
+
+
+def ensure_canonical(paths=RAW_INPUTS, force=False):
+    """为存在的原始文件生成规范文件；源文件与输出的校验和都与 manifest 一致时跳过。
+
+    返回 {文件名: 'normalized' / 'current'}。"""
+    manifest = load_manifest()
+    status = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        name = os.path.basename(path)
+        if not force and name in manifest and is_current(manifest[name], path):
+            status[name] = 'current'
+            continue
+        manifest[name] = normalize_file(path, canonical_path(name))
+        status[name] = 'normalized'
+
+    if 'normalized' in status.values():
+        fd, tmp = tempfile.mkstemp(dir=CANONICAL_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, MANIFEST_FILE)
+    return status
+
+
+if __name__ == '__main__':
+    import sys
+
+    print("=" * 80)
+    print("原始输入编码规范化")
+    print("=" * 80)
+
+    status = ensure_canonical(force='--force' in sys.argv[1:])
+    manifest = load_manifest()
+
+    print()
+    for name, state in status.items():
+        entry = manifest[name]
+        bom = '，带BOM' if entry['bom'] else ''
+        action = '已规范化' if state == 'normalized' else '未变化，跳过'
+        print(f"  ✓ {name}: {entry['encoding']}{bom}，{entry['rows']} 行，"
+              f"修改 {entry['changed_cells']} 个单元格 ({action})")
+    for path in RAW_INPUTS:
+        if not os.path.exists(path):
+            print(f"  - {path}: 文件不存在，跳过")
+
+    print(f"\n  ✓ 规范文件目录: {CANONICAL_DIR}/，校验和: {MANIFEST_FILE}")
+    print("\n编码规范化完成! ✓")
+    print("=" * 80)
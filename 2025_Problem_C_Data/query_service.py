@@ -0,0 +1,257 @@
+import sys
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+from data_schema import load_table
+
+# 只读查询服务：特征表与最新预测常驻内存，按 NOC / Year 建立索引
+# 启动时加载一次，之后每个请求只做字典查找与切片；历史查询的 JSON 在加载时预先序列化。
+# 流水线发布新的输出文件后，后台线程检测到修改时间变化，完整构建新快照后一次性替换引用，
+# 请求线程始终看到完整的旧快照或新快照，不会读到一半。
+# 用法: python query_service.py [--port 8765]
+#   GET /history?noc=CHN
+#   GET /top?year=2024&n=10&by=Total_Medals
+#   GET /forecast?noc=USA[&year=2028]
+#   GET /health
+
+DEFAULT_PORT = 8765
+RELOAD_INTERVAL = 2.0    # 秒
+SNAPSHOT_ATTEMPTS = 3    # 读取期间源文件被改写时的重试次数
+MAX_TOP_N = 200
+PREDICTION_FILE = '2024_prediction_results.csv'
+SCENARIO_FILE = 'scenario_results.csv'
+SOURCE_FILES = ['country_year_features.csv', PREDICTION_FILE, SCENARIO_FILE]
+
+HISTORY_COLUMNS = ['Year', 'Gold_Medals', 'Silver_Medals', 'Bronze_Medals', 'Total_Medals',
+                   'Athlete_Count', 'Sport_Count', 'Event_Count', 'Is_Host']
+RANK_COLUMNS = ['Gold_Medals', 'Total_Medals']
+FORECAST_COLUMNS = ['Pred_Gold', 'Gold_Lower', 'Gold_Upper', 'Pred_Total', 'Total_Lower', 'Total_Upper']
+
+
+def records(df):
+    """DataFrame -> JSON 可序列化的字典列表（numpy 标量转为 Python 类型）。"""
+    return json.loads(df.to_json(orient='records'))
+
+
+def load_forecasts():
+    """2024年验证集预测 + scenario_engine.py 的2028年基准情景，返回 {NOC: {年份: 预测区间}}。"""
+    frames = []
+    if os.path.exists(PREDICTION_FILE):
+        frames.append(pd.read_csv(PREDICTION_FILE, encoding='utf-8'))
+    if os.path.exists(SCENARIO_FILE):
+        scenarios = pd.read_csv(SCENARIO_FILE, encoding='utf-8')
+        frames.append(scenarios[scenarios['Scenario'] == 'baseline'].assign(Year=2028))
+    if not frames:
+        return {}
+    forecasts = pd.concat(frames, ignore_index=True)[['NOC', 'Year'] + FORECAST_COLUMNS]
+    forecasts['NOC'] = forecasts['NOC'].astype(str)
+    forecasts[FORECAST_COLUMNS] = forecasts[FORECAST_COLUMNS].round(2)
+    index = {}
+    for row in records(forecasts):
+        index.setdefault(row.pop('NOC'), {})[str(row.pop('Year'))] = row
+    return index
+
+
+def read_snapshot():
+    """读取全部源文件并建立索引，返回快照字典（不含签名）。"""
+    df = load_table('features', usecols=['NOC'] + HISTORY_COLUMNS)
+    df['NOC'] = df['NOC'].astype(str)
+    df['Is_Host'] = df['Is_Host'].astype(int)
+    df = df.sort_values(['NOC', 'Year']).reset_index(drop=True)
+
+    # NOC 索引：只保留真正参赛的年份，整段历史预先序列化为 JSON
+    participated = df[df['Athlete_Count'] > 0]
+    history = {noc: json.dumps({'noc': noc, 'history': records(group.drop(columns='NOC'))}).encode('utf-8')
+               for noc, group in participated.groupby('NOC', sort=False)}
+
+    # Year 索引：每个排序指标下按降序排好的记录列表，top-N 只需切片
+    ranked = {}
+    for column in RANK_COLUMNS:
+        ordered = participated.sort_values(['Year', column], ascending=[True, False])
+        ranked[column] = {int(year): records(group[['NOC'] + HISTORY_COLUMNS[1:]])
+                          for year, group in ordered.groupby('Year', sort=False)}
+
+    return {
+        'history': history,
+        'ranked': ranked,
+        'forecast': load_forecasts(),
+        'loaded_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': len(df),
+    }
+
+
+def build_snapshot(attempts=SNAPSHOT_ATTEMPTS):
+    """读取前后各取一次源文件签名，一致时才返回快照，否则重试。
+
+    签名在读取前获取：读取期间被改写的文件在下次轮询时仍会被发现，不会因签名较新而被跳过。"""
+    for _ in range(attempts):
+        signature = source_signature()
+        snapshot = read_snapshot()
+        if source_signature() == signature:
+            snapshot['signature'] = signature
+            return snapshot
+    raise OSError(f"源文件在读取期间持续变化，{attempts} 次尝试后放弃")
+
+
+def source_signature():
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in SOURCE_FILES)
+
+
+class QueryStore:
+    """持有当前快照；reload 在锁外构建新快照，完成后一次赋值替换。"""
+
+    def __init__(self):
+        self.snapshot = build_snapshot()
+        self.version = 1
+        self._reload_lock = threading.Lock()
+
+    def reload_if_changed(self):
+        signature = source_signature()
+        if signature == self.snapshot['signature'] or not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            snapshot = build_snapshot()
+        except (OSError, ValueError, KeyError, pd.errors.ParserError) as e:
+            # 文件正在写入或格式不完整：保留旧快照，下次轮询重试
+            print(f"  ⚠ 重新加载失败，继续使用旧快照: {e}")
+            return False
+        finally:
+            self._reload_lock.release()
+        self.snapshot = snapshot
+        self.version += 1
+        print(f"  ✓ 已重新加载 (版本 {self.version}, {snapshot['loaded_at']})")
+        return True
+
+    def watch(self, interval=RELOAD_INTERVAL):
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.reload_if_changed()
+        threading.Thread(target=loop, daemon=True).start()
+
+    # ============== 查询 ==============
+    # 每个查询返回 (HTTP 状态码, JSON 字节串)
+
+    def history(self, noc):
+        body = self.snapshot['history'].get(noc.upper())
+        if body is None:
+            return 404, error(f"未知的 NOC: {noc}")
+        return 200, body
+
+    def top(self, year, n=10, by='Total_Medals'):
+        ranked = self.snapshot['ranked'].get(by)
+        if ranked is None:
+            return 400, error(f"by 只能是 {RANK_COLUMNS}")
+        if not 0 < n <= MAX_TOP_N:
+            return 400, error(f"n 必须在 1 到 {MAX_TOP_N} 之间")
+        rows = ranked.get(year)
+        if rows is None:
+            return 404, error(f"没有 {year} 年的数据")
+        return 200, json.dumps({'year': year, 'by': by, 'top': rows[:n]}).encode('utf-8')
+
+    def forecast(self, noc, year=None):
+        forecasts = self.snapshot['forecast'].get(noc.upper())
+        if forecasts is None:
+            return 404, error(f"没有 {noc} 的预测")
+        if year is not None:
+            if str(year) not in forecasts:
+                return 404, error(f"没有 {noc} 在 {year} 年的预测")
+            forecasts = {str(year): forecasts[str(year)]}
+        return 200, json.dumps({'noc': noc.upper(), 'forecast': forecasts}).encode('utf-8')
+
+    def health(self):
+        snapshot = self.snapshot
+        return 200, json.dumps({'version': self.version, 'loaded_at': snapshot['loaded_at'],
+                                'rows': snapshot['rows'], 'nocs': len(snapshot['history'])}).encode('utf-8')
+
+
+def error(message):
+    return json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+
+def make_handler(store):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                if url.path == '/history':
+                    status, body = store.history(params['noc'])
+                elif url.path == '/top':
+                    status, body = store.top(int(params['year']), int(params.get('n', 10)),
+                                             params.get('by', 'Total_Medals'))
+                elif url.path == '/forecast':
+                    year = int(params['year']) if 'year' in params else None
+                    status, body = store.forecast(params['noc'], year)
+                elif url.path == '/health':
+                    status, body = store.health()
+                else:
+                    status, body = 404, error(f"未知的路径: {url.path}")
+            except KeyError as e:
+                status, body = 400, error(f"缺少参数: {e.args[0]}")
+            except ValueError as e:
+                status, body = 400, error(f"参数格式错误: {e}")
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # 不为每个请求打印日志
+
+    return QueryHandler
+
+
+def time_queries(store, repeats=1000):
+    """进程内测量各类查询的平均耗时（微秒），不含网络开销。"""
+    nocs = list(store.snapshot['history'])
+    years = list(store.snapshot['ranked']['Total_Medals'])
+    forecast_nocs = list(store.snapshot['forecast']) or nocs
+    timings = {}
+    for name, query in [
+        ('history', lambda i: store.history(nocs[i % len(nocs)])),
+        ('top', lambda i: store.top(years[i % len(years)], 10)),
+        ('forecast', lambda i: store.forecast(forecast_nocs[i % len(forecast_nocs)])),
+    ]:
+        start = time.perf_counter()
+        for i in range(repeats):
+            query(i)
+        timings[name] = (time.perf_counter() - start) / repeats * 1e6
+    return timings
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("特征与预测查询服务")
+    print("=" * 80)
+
+    args = sys.argv[1:]
+    port = int(args[args.index('--port') + 1]) if '--port' in args else DEFAULT_PORT
+
+    print("\n[Step 1] 加载数据并建立索引...")
+    start = time.perf_counter()
+    store = QueryStore()
+    snapshot = store.snapshot
+    print(f"  ✓ {snapshot['rows']} 行特征，{len(snapshot['history'])} 个参赛国，"
+          f"{len(snapshot['forecast'])} 个国家有预测 ({time.perf_counter() - start:.2f} 秒)")
+
+    timings = time_queries(store)
+    print("  ✓ 进程内平均查询耗时: " + ", ".join(f"{name} {us:.1f} µs" for name, us in timings.items()))
+
+    print(f"\n[Step 2] 监听 http://127.0.0.1:{port}  (Ctrl+C 退出)")
+    print(f"  例: curl 'http://127.0.0.1:{port}/top?year=2024&n=5'")
+    store.watch()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(store))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n服务已停止")
+        server.server_close()
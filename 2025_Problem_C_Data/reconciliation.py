@@ -0,0 +1,269 @@
+import io
+import os
+import time
+
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, cg
+from data_schema import load_table
+from normalize_inputs import canonical_path, read_text
+
+# 层级预测协调 (Reconciliation)：小项设置(分项) → 大项 → 国家 → 全球
+# modeling_strategy.py 对各国独立预测，加总后与当届实际可发的奖牌数不一致。
+# 这里以 (NOC, 分项) 为最底层序列，聚合层包括：各国总数、各分项总数、各大项总数、全球总数，
+# 各层的基础预测来源：
+#   - NOC 层：模型预测（方差取自分位数预测区间）
+#   - 分项/大项/全球层：由赛事表的小项数推出的可发奖牌数（几乎确定，方差很小）
+#   - 底层：该国在此前3届中该分项的奖牌份额 × 本届该分项的可发奖牌数
+# 再用加权最小二乘 (MinT 对角近似 / WLS；权重全为1时即 OLS) 求一致的底层预测：
+#   b = (S' W⁻¹ S)⁻¹ S' W⁻¹ ŷ
+# S 为稀疏求和矩阵；正规方程含全球层的稠密秩一项，不显式构造，而以 S' W⁻¹ S x 的
+# 稀疏矩阵-向量乘积作为线性算子，用共轭梯度法求解。
+
+HISTORY_EDITIONS = 3       # 份额估计使用的历届数
+KNOWN_VARIANCE = 1e-3      # 由赛事设置决定的总数的方差（近似硬约束）
+MIN_VARIANCE = 0.25        # 方差下限，避免零预测的序列权重无穷大
+INTERVAL_Z = 1.645         # 90% 预测区间对应的正态分位数
+PREDICTION_FILE = '2024_prediction_results.csv'
+MEDAL_COUNTS_FILE = 'summerOly_medal_counts.csv'
+
+# 目标 -> (预测列, 下界列, 上界列, 运动员表中的奖牌取值)
+TARGETS = {
+    'Gold': ('Pred_Gold', 'Gold_Lower', 'Gold_Upper', ['Gold']),
+    'Total': ('Pred_Total', 'Total_Lower', 'Total_Upper', ['Gold', 'Silver', 'Bronze']),
+}
+
+
+def programme_disciplines(programs_df, year):
+    """本届设有小项的分项：返回 (Sport, Discipline, Events)，Discipline 缺失时用 Sport 代替。"""
+    programs_df = programs_df[~programs_df['Sport'].astype(str).str.startswith('Total')]
+    events = pd.to_numeric(programs_df[str(year)], errors='coerce').fillna(0)
+    table = pd.DataFrame({
+        'Sport': programs_df['Sport'].astype(str),
+        'Discipline': programs_df['Discipline'].fillna(programs_df['Sport']).astype(str),
+        'Events': events,
+    })
+    table = table.groupby(['Sport', 'Discipline'], as_index=False, sort=False)['Events'].sum()
+    return table[table['Events'] > 0].reset_index(drop=True)
+
+
+def load_unfiltered_medal_counts(path=MEDAL_COUNTS_FILE):
+    """未经清洗的奖牌榜：清洗阶段会删除或合并部分 NOC（如历史代表团、中立运动员），
+    按清洗后的表汇总会少算实际颁发的奖牌。优先读取规范文件，尚未生成时按检测到的编码读取原始文件。"""
+    if os.path.exists(canonical_path(path)):
+        return pd.read_csv(canonical_path(path), encoding='utf-8')
+    text, _, _ = read_text(path)
+    return pd.read_csv(io.StringIO(text))
+
+
+def medals_per_event(medal_counts_df, programs_df, year):
+    """上一届实际颁发的奖牌总数 / 小项数（含并列铜牌等），用于把小项数换算为可发奖牌数。
+
+    medal_counts_df 须为未经清洗的奖牌榜（load_unfiltered_medal_counts），否则比率偏低。"""
+    years = sorted(y for y in medal_counts_df['Year'].unique() if y < year)
+    previous = years[-1]
+    awarded = medal_counts_df.loc[medal_counts_df['Year'] == previous, 'Total'].sum()
+    events = programme_disciplines(programs_df, previous)['Events'].sum()
+    return awarded / events
+
+
+def discipline_shares(athletes_df, disciplines, year, medals):
+    """各 NOC 在此前几届每个分项中的奖牌单位份额，返回 (NOC数组, 份额矩阵 (NOC数, 分项数), 匹配率)。
+
+    运动员表的 Sport 先按分项名匹配（分项名唯一时），否则按大项名匹配；按大项匹配的份额
+    用于该大项下的所有分项。"""
+    years = sorted(y for y in athletes_df['Year'].unique() if y < year)[-HISTORY_EDITIONS:]
+    units = athletes_df[athletes_df['Is_Medal_Unit'] & athletes_df['Year'].isin(years)
+                        & athletes_df['Medal'].isin(medals)]
+    counts = units.groupby([units['NOC'].astype(str), units['Sport'].astype(str)]).size().unstack(fill_value=0)
+
+    unique_discipline = ~disciplines['Discipline'].duplicated(keep=False)
+    column_for = np.where(unique_discipline & disciplines['Discipline'].isin(counts.columns),
+                          disciplines['Discipline'], disciplines['Sport'])
+    matched = counts.reindex(columns=pd.unique(column_for), fill_value=0)
+    coverage = matched.to_numpy().sum() / max(counts.to_numpy().sum(), 1)
+
+    totals = matched.sum(axis=0).replace(0, np.nan)
+    shares = (matched / totals).fillna(0).reindex(columns=column_for)
+    return shares.index.to_numpy(), shares.to_numpy(), coverage
+
+
+def summing_matrix(n_noc, sport_code, n_sport):
+    """底层为 NOC × 分项 (按 NOC 优先展开)，聚合层依次为：NOC、分项、大项、全球。"""
+    n_disc = len(sport_code)
+    n_bottom = n_noc * n_disc
+    bottom = np.arange(n_bottom)
+    noc_of = bottom // n_disc
+    disc_of = bottom % n_disc
+    ones = np.ones(n_bottom)
+    blocks = [
+        sparse.identity(n_bottom, format='csr'),
+        sparse.csr_matrix((ones, (noc_of, bottom)), shape=(n_noc, n_bottom)),
+        sparse.csr_matrix((ones, (disc_of, bottom)), shape=(n_disc, n_bottom)),
+        sparse.csr_matrix((ones, (sport_code[disc_of], bottom)), shape=(n_sport, n_bottom)),
+        sparse.csr_matrix(ones[np.newaxis, :]),
+    ]
+    return sparse.vstack(blocks, format='csr')
+
+
+def reconcile(S, base, variance):
+    """求 (S' W⁻¹ S) b = S' W⁻¹ ŷ，W = diag(variance)；返回底层协调预测与 CG 迭代次数。"""
+    weights = 1.0 / variance
+    St = S.T.tocsr()
+    n_bottom = S.shape[1]
+    normal = LinearOperator((n_bottom, n_bottom), matvec=lambda x: St @ (weights * (S @ x)), dtype=float)
+    rhs = St @ (weights * base)
+    # Jacobi 预条件：正规矩阵的对角线即 S 各列的加权平方和
+    diagonal = St @ weights   # S 为 0/1 矩阵，列平方和等于列和
+    preconditioner = LinearOperator((n_bottom, n_bottom), matvec=lambda x: x / diagonal, dtype=float)
+    iterations = []
+    solution, info = cg(normal, rhs, M=preconditioner, rtol=1e-10, maxiter=2000,
+                        callback=lambda _: iterations.append(1))
+    if info != 0:
+        raise RuntimeError(f"共轭梯度法未收敛 (info={info})")
+    return solution, len(iterations)
+
+
+def reconcile_nonnegative(S, base, variance, max_rounds=20):
+    """奖牌数不能为负：把解为负的底层序列固定为0（从 S 中去掉对应列）后重解，直到没有负值。
+
+    直接截断会使各层总数不再一致；固定为0后重解，其余序列会吸收这部分差额。
+    全部序列都被固定为0时，全零即唯一的非负解；max_rounds 轮后仍有负值时报错，不返回截断后的解。
+    返回 (底层解, CG 总迭代次数, 重解轮数)。"""
+    active = np.ones(S.shape[1], dtype=bool)
+    solution = np.zeros(S.shape[1])
+    total_iterations = 0
+    for rounds in range(1, max_rounds + 1):
+        solution[:] = 0
+        solution[active], iterations = reconcile(S[:, active], base, variance)
+        total_iterations += iterations
+        negative = solution < 0
+        if not negative.any():
+            break
+        active &= ~negative
+        if not active.any():
+            solution[:] = 0
+            break
+    else:
+        raise RuntimeError(f"非负协调 {max_rounds} 轮后仍有 {int(negative.sum())} 个底层序列为负")
+    return solution, total_iterations, rounds
+
+
+def reconcile_target(target, results, athletes_df, disciplines, available, year, ols=False):
+    """协调一个目标（金牌或总奖牌），返回 (各国表, NOC × 分项长表, 诊断信息)。"""
+    pred_col, lower_col, upper_col, medals = TARGETS[target]
+    nocs = results['NOC'].astype(str).to_numpy()
+    n_noc, n_disc = len(nocs), len(disciplines)
+    sports, sport_code = np.unique(disciplines['Sport'].to_numpy(), return_inverse=True)
+
+    # 底层基础预测：历史份额 × 可发奖牌数
+    share_nocs, shares, coverage = discipline_shares(athletes_df, disciplines, year, medals)
+    share = np.zeros((n_noc, n_disc))
+    row = pd.Index(share_nocs).get_indexer(nocs)
+    share[row >= 0] = shares[row[row >= 0]]
+    bottom_base = (share * available[np.newaxis, :]).ravel()
+
+    noc_base = results[pred_col].to_numpy(dtype=float)
+    noc_sd = (results[upper_col] - results[lower_col]).to_numpy(dtype=float) / (2 * INTERVAL_Z)
+    sport_available = np.bincount(sport_code, weights=available, minlength=len(sports))
+
+    base = np.concatenate([bottom_base, noc_base, available, sport_available, [available.sum()]])
+    if ols:
+        variance = np.ones_like(base)
+    else:
+        variance = np.concatenate([
+            np.maximum(bottom_base, MIN_VARIANCE),
+            np.maximum(noc_sd ** 2, MIN_VARIANCE),
+            np.full(n_disc + len(sports) + 1, KNOWN_VARIANCE),
+        ])
+
+    S = summing_matrix(n_noc, sport_code, len(sports))
+    start = time.perf_counter()
+    bottom, iterations, rounds = reconcile_nonnegative(S, base, variance)
+    elapsed = time.perf_counter() - start
+
+    bottom = bottom.reshape(n_noc, n_disc)
+    countries = pd.DataFrame({'NOC': nocs, f'Pred_{target}': noc_base,
+                              f'Reconciled_{target}': bottom.sum(axis=1)})
+    cells = pd.DataFrame({
+        'NOC': np.repeat(nocs, n_disc),
+        'Sport': np.tile(disciplines['Sport'].to_numpy(), n_noc),
+        'Discipline': np.tile(disciplines['Discipline'].to_numpy(), n_noc),
+        target: bottom.ravel(),
+    })
+    diagnostics = {
+        'target': target, 'bottom_series': n_noc * n_disc, 'rows_S': S.shape[0], 'nnz_S': S.nnz,
+        'iterations': iterations, 'rounds': rounds, 'seconds': elapsed, 'share_coverage': coverage,
+        'available': available.sum(), 'base_sum': noc_base.sum(), 'reconciled_sum': bottom.sum(),
+    }
+    return countries, cells, diagnostics
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("层级预测协调：分项 → 大项 → 国家 → 全球")
+    print("=" * 80)
+
+    # ============== 第1步：加载预测与赛事设置 ==============
+    print("\n[Step 1] 加载预测与赛事设置...")
+
+    results = pd.read_csv(PREDICTION_FILE, encoding='utf-8')
+    year = int(results['Year'].iloc[0])
+    athletes_df = load_table('athletes', usecols=['NOC', 'Year', 'Sport', 'Medal', 'Is_Medal_Unit'])
+    medal_counts_df = load_unfiltered_medal_counts()
+    programs_df = load_table('programs')
+
+    disciplines = programme_disciplines(programs_df, year)
+    events = disciplines['Events'].to_numpy(dtype=float)
+    per_event = medals_per_event(medal_counts_df, programs_df, year)
+    print(f"  ✓ {year}年: {len(results)} 个国家，{len(disciplines)} 个分项，{events.sum():.0f} 个小项")
+    print(f"  ✓ 上一届每个小项平均颁发 {per_event:.3f} 枚奖牌")
+
+    # ============== 第2步：协调 ==============
+    print("\n[Step 2] 稀疏 WLS 协调...")
+
+    available = {'Gold': events, 'Total': events * per_event}
+    tables, cells, report = [], [], []
+    for target in TARGETS:
+        countries, target_cells, diagnostics = reconcile_target(
+            target, results, athletes_df, disciplines, available[target], year
+        )
+        tables.append(countries.set_index('NOC'))
+        cells.append(target_cells.set_index(['NOC', 'Sport', 'Discipline']))
+        report.append(diagnostics)
+        print(f"  ✓ {target}: {diagnostics['bottom_series']} 条底层序列，S 为 {diagnostics['rows_S']} 行 / "
+              f"{diagnostics['nnz_S']} 个非零元，{diagnostics['rounds']} 轮共 {diagnostics['iterations']} 次CG迭代 ({diagnostics['seconds']:.3f} 秒)")
+
+    medal_table = pd.concat(tables, axis=1).reset_index()
+    actual = results[['NOC', 'Gold_Medals', 'Total_Medals']].astype({'NOC': str})
+    medal_table = medal_table.merge(actual, on='NOC', how='left')
+    cell_table = pd.concat(cells, axis=1).reset_index()
+    cell_table = cell_table[(cell_table['Gold'] > 1e-6) | (cell_table['Total'] > 1e-6)]
+
+    # ============== 第3步：保存 ==============
+    print("\n[Step 3] 保存结果...")
+
+    medal_table.to_csv('reconciled_medal_table.csv', index=False, encoding='utf-8')
+    cell_table.to_csv('reconciled_discipline_medals.csv', index=False, encoding='utf-8')
+    print("  ✓ reconciled_medal_table.csv")
+    print("  ✓ reconciled_discipline_medals.csv")
+
+    # ============== 报告 ==============
+    print("\n" + "=" * 80)
+    print("一致性与精度")
+    print("=" * 80)
+    for diagnostics in report:
+        target = diagnostics['target']
+        truth = medal_table[f'{target}_Medals']
+        mae_before = (medal_table[f'Pred_{target}'] - truth).abs().mean()
+        mae_after = (medal_table[f'Reconciled_{target}'] - truth).abs().mean()
+        print(f"{target}: 可发 {diagnostics['available']:.0f}，原预测合计 {diagnostics['base_sum']:.1f}，"
+              f"协调后合计 {diagnostics['reconciled_sum']:.1f}；实际 {truth.sum():.0f}")
+        print(f"  MAE {mae_before:.3f} → {mae_after:.3f}，历史份额匹配率 {diagnostics['share_coverage']:.1%}")
+
+    print("\n【协调后总奖牌前10】")
+    print(medal_table.nlargest(10, 'Reconciled_Total').round(2).to_string(index=False))
+
+    print("\n层级协调完成! ✓")
+    print("=" * 80)
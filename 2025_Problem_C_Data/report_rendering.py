@@ -0,0 +1,260 @@
+import sys
+import os
+import json
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # 无界面后端，不依赖显示环境
+import matplotlib.pyplot as plt
+from matplotlib import font_manager
+import seaborn as sns
+from sklearn.metrics import r2_score
+
+# 报告渲染阶段：读取 modeling_strategy.py / model_explainability.py 持久化的结果，
+# 在进程池中并行渲染各图表与文本报告；输入未变化的产物直接跳过
+# 用法: python report_rendering.py [--force]
+
+RESULTS_FILE = '2024_prediction_results.csv'
+MANIFEST_FILE = 'report_manifest.json'
+RENDER_VERSION = 1  # 修改渲染逻辑后递增，使已有产物全部失效
+
+
+def configure_fonts():
+    """有 SimHei 时用于中文显示，没有则回退到默认字体，而不是让整个渲染失败。"""
+    installed = {f.name for f in font_manager.fontManager.ttflist}
+    preferred = [name for name in ['SimHei', 'Arial'] if name in installed]
+    plt.rcParams['font.sans-serif'] = preferred + ['DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    sns.set_style("whitegrid")
+
+
+def render_eval_scatter(inputs, output):
+    # 图1: 预测值 vs 真实值 (总奖牌)
+    results = pd.read_csv(inputs[0])
+    fig = plt.figure(figsize=(10, 6))
+    plt.scatter(results['Total_Medals'], results['Pred_Total'], alpha=0.6, color='blue')
+    plt.plot([0, 140], [0, 140], 'r--', lw=2)  # 对角线
+    plt.xlabel('Actual Total Medals (2024)')
+    plt.ylabel('Predicted Total Medals (2024)')
+    plt.title('Reference Line (Red) vs Prediction (Blue)')
+    plt.grid(True)
+    plt.savefig(output)
+    plt.close(fig)
+
+
+def render_feature_importance(inputs, output):
+    # 图2: 特征重要性 (使用金牌模型)
+    feature_imp = pd.read_csv(inputs[0]).sort_values('Importance', ascending=False)
+    fig = plt.figure(figsize=(10, 6))
+    sns.barplot(x=feature_imp['Importance'].values, y=feature_imp['Feature'].values,
+                hue=feature_imp['Feature'].values, palette='viridis', legend=False)
+    plt.title('Feature Importance (Gold Medal Model)')
+    plt.xlabel('Importance Score')
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close(fig)
+
+
+def render_top15(inputs, output):
+    # 图3: 前15名国家预测对比
+    results = pd.read_csv(inputs[0])
+    top_countries = results.sort_values('Total_Medals', ascending=False).head(15)
+    fig = plt.figure(figsize=(14, 7))
+    x = np.arange(len(top_countries))
+    width = 0.35
+
+    plt.bar(x - width/2, top_countries['Total_Medals'], width, label='Actual', color='navy')
+    # Calculate error bars with safety checks for non-negative values
+    lower_diff = (top_countries['Pred_Total'] - top_countries['Total_Lower']).clip(lower=0)
+    upper_diff = (top_countries['Total_Upper'] - top_countries['Pred_Total']).clip(lower=0)
+
+    plt.bar(x + width/2, top_countries['Pred_Total'], width, label='Predicted', color='skyblue', yerr=[
+        lower_diff,
+        upper_diff
+    ], capsize=5)
+
+    plt.xlabel('Country')
+    plt.ylabel('Total Medals')
+    plt.title('Top 15 Countries: Actual vs Predicted (2024) with 90% Confidence Interval')
+    plt.xticks(x, top_countries['NOC'])
+    plt.legend()
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close(fig)
+
+
+def render_text_report(inputs, output):
+    results = pd.read_csv(inputs[0])
+
+    # 选取重点关注的国家：金牌榜前10 + 东道主(FRA)
+    top_gold_nocs = results.sort_values('Gold_Medals', ascending=False).head(10)['NOC'].tolist()
+    if 'FRA' not in top_gold_nocs:
+        top_gold_nocs.append('FRA')
+
+    display_cols = ['NOC', 'Gold_Medals', 'Pred_Gold', 'Gold_Diff', 'Gold_Lower', 'Gold_Upper',
+                    'Total_Medals', 'Pred_Total', 'Total_Diff']
+
+    subset = results[results['NOC'].isin(top_gold_nocs)].sort_values('Gold_Medals', ascending=False)
+    report_str = subset[display_cols].round(1).to_string(index=False)
+
+    r2_gold = r2_score(results['Gold_Medals'], results['Pred_Gold'])
+    r2_total = r2_score(results['Total_Medals'], results['Pred_Total'])
+
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write("="*80 + "\n")
+        f.write("【2024年预测效果详解】 (按真实金牌数排序)\n")
+        f.write("说明：Error = 预测值 - 真实值 (正数表示高估，负数表示低估)\n")
+        f.write("="*80 + "\n")
+        f.write(report_str + "\n\n")
+        f.write("【模型关键指标解读】\n")
+        f.write(f"1. 解释度 (R2): 金牌模型 {r2_gold:.3f} / 总奖牌模型 {r2_total:.3f}\n")
+        f.write("   -> 超过0.9说明模型极好地捕捉了奖牌分布规律。\n")
+        f.write("2. 东道主效应捕捉 (FRA):\n")
+        fra_row = results[results['NOC'] == 'FRA'].iloc[0]
+        f.write(f"   - 真实: {fra_row['Gold_Medals']}金 / {fra_row['Total_Medals']}总\n")
+        f.write(f"   - 预测: {fra_row['Pred_Gold']:.1f}金 / {fra_row['Pred_Total']:.1f}总\n")
+        f.write(f"   - 评价: 预测{'高估' if fra_row['Gold_Diff'] > 0 else '低估'}了 {abs(fra_row['Gold_Diff']):.1f} 枚金牌\n")
+
+
+def render_permutation_importance(inputs, output):
+    # 置换重要性（目标 × 模型）
+    importance_df = pd.read_csv(inputs[0])
+    targets = importance_df['Target'].unique()
+    model_names = importance_df['Model'].unique()
+    features = importance_df['Feature'].unique()
+
+    fig, axes = plt.subplots(len(targets), len(model_names), figsize=(18, 10), sharey=True, squeeze=False)
+    for i, target in enumerate(targets):
+        for j, model_name in enumerate(model_names):
+            sub = importance_df[(importance_df['Target'] == target) & (importance_df['Model'] == model_name)]
+            sub = sub.set_index('Feature').reindex(features)
+            ax = axes[i, j]
+            ax.barh(sub.index, sub['Importance_Mean'], xerr=sub['Importance_Std'], color='teal')
+            ax.set_title(f'{target} / {model_name}')
+            ax.set_xlabel('Loss Increase')
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close(fig)
+
+
+def render_partial_dependence(inputs, output):
+    # 主模型的部分依赖曲线（含 ICE 背景线）
+    pd_df = pd.read_csv(inputs[0])
+    ice_df = pd.read_csv(inputs[1])
+    pd_df = pd_df[pd_df['Model'] == 'main']
+    ice_df = ice_df[ice_df['Model'] == 'main']
+    targets = pd_df['Target'].unique()
+    features = pd_df['Feature'].unique()
+
+    fig, axes = plt.subplots(len(targets), len(features), figsize=(3 * len(features), 6), squeeze=False)
+    for i, target in enumerate(targets):
+        for j, feature in enumerate(features):
+            ax = axes[i, j]
+            ice_sub = ice_df[(ice_df['Target'] == target) & (ice_df['Feature'] == feature)]
+            ice_wide = ice_sub.pivot(index='Grid_Value', columns='NOC', values='Prediction')
+            ax.plot(ice_wide.index, ice_wide.values, color='grey', alpha=0.1, lw=0.5)
+            pd_sub = pd_df[(pd_df['Target'] == target) & (pd_df['Feature'] == feature)]
+            ax.plot(pd_sub['Grid_Value'], pd_sub['Partial_Dependence'], color='red', lw=2)
+            ax.set_title(feature, fontsize=8)
+            if j == 0:
+                ax.set_ylabel(target)
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close(fig)
+
+
+# 产物 -> (渲染函数, 输入文件)
+ARTIFACTS = {
+    'model_eval_scatter.png': (render_eval_scatter, [RESULTS_FILE]),
+    'model_feature_importance.png': (render_feature_importance, ['model_feature_importance.csv']),
+    'model_top15_compare.png': (render_top15, [RESULTS_FILE]),
+    '2024_prediction_report.txt': (render_text_report, [RESULTS_FILE]),
+    'model_permutation_importance.png': (render_permutation_importance, ['explain_permutation_importance.csv']),
+    'model_partial_dependence.png': (render_partial_dependence,
+                                     ['explain_partial_dependence.csv', 'explain_ice_curves.csv']),
+}
+
+
+def input_digest(output, inputs):
+    """产物名 + 渲染版本 + 全部输入文件内容的 SHA-256。"""
+    h = hashlib.sha256(f'{output}:{RENDER_VERSION}'.encode('utf-8'))
+    for path in inputs:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def render_one(output):
+    func, inputs = ARTIFACTS[output]
+    start = time.perf_counter()
+    func(inputs, output)
+    return output, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    force = '--force' in sys.argv[1:]
+
+    print("=" * 80)
+    print("报告渲染：并行生成图表与文本报告")
+    print("=" * 80)
+
+    # ============== 第1步：检查输入变化 ==============
+    print("\n[Step 1] 检查输入是否变化...")
+
+    manifest = {}
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    pending = {}
+    for output, (_, inputs) in ARTIFACTS.items():
+        missing = [path for path in inputs if not os.path.exists(path)]
+        if missing:
+            print(f"  ⚠ 跳过 {output}: 缺少输入 {missing}")
+            continue
+        digest = input_digest(output, inputs)
+        if not force and os.path.exists(output) and manifest.get(output) == digest:
+            print(f"  - {output}: 输入未变化，跳过")
+            continue
+        pending[output] = digest
+
+    print(f"  ✓ 需要渲染 {len(pending)} / {len(ARTIFACTS)} 个产物")
+
+    # ============== 第2步：并行渲染 ==============
+    if pending:
+        print("\n[Step 2] 进程池并行渲染...")
+
+        start = time.perf_counter()
+        errors = []
+        try:
+            with ProcessPoolExecutor(initializer=configure_fonts) as executor:
+                futures = {executor.submit(render_one, output): output for output in pending}
+                for future in as_completed(futures):
+                    output = futures[future]
+                    try:
+                        _, elapsed = future.result()
+                    except Exception as e:
+                        # 失败的产物可能只写了一半，去掉其摘要，下次一定重新渲染
+                        manifest.pop(output, None)
+                        errors.append(e)
+                        print(f"  ✗ 渲染失败: {output} ({type(e).__name__}: {e})")
+                        continue
+                    manifest[output] = pending[output]
+                    print(f"  ✓ 已保存: {output} ({elapsed:.2f} 秒)")
+        finally:
+            # 部分渲染失败或被中断时也保存已成功产物的摘要，下次只重新渲染其余产物
+            with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+        print(f"\n  总用时 {time.perf_counter() - start:.2f} 秒")
+        if errors:
+            raise errors[0]
+
+    print("\n报告渲染完成! ✓")
+    print("=" * 80)
@@ -0,0 +1,222 @@
+import sys
+import os
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# 流水线调度：按各脚本声明的输入/输出文件构建依赖图(DAG)
+# - 某节点的输入由另一节点产出时，二者之间有一条依赖边
+# - 相互独立的节点在线程池中并发运行（每个节点是一个独立的子进程）
+# - 节点成功后写入 pipeline_logs/<节点>.stamp；输出文件均存在、且该标记不早于全部输入文件、
+#   脚本本身及其导入的本地模块时，视为最新，直接跳过
+# - 检查类节点（verify）以标记文件为输出，下游以它为输入：检查失败时下游被阻断
+# - 结束时给出关键路径：端到端耗时的下界由最长依赖链决定，而不是各阶段耗时之和
+# 用法: python run_pipeline.py [--force] [--jobs N]
+
+LOG_DIR = 'pipeline_logs'
+
+RAW_FILES = ['summerOly_athletes.csv', 'summerOly_medal_counts.csv',
+             'summerOly_hosts.csv', 'summerOly_programs.csv']
+CANONICAL_FILES = [os.path.join('canonical', name) for name in RAW_FILES]
+CANONICAL_DICTIONARY = os.path.join('canonical', 'data_dictionary.csv')
+CLEANED_FILES = ['summerOly_athletes_cleaned.csv', 'summerOly_medal_counts_cleaned.csv',
+                 'summerOly_hosts_cleaned.csv', 'summerOly_programs_cleaned.csv']
+FEATURES_FILE = 'country_year_features.csv'
+MODEL_FILE = 'model_artifacts.joblib'
+VERIFY_STAMP = os.path.join(LOG_DIR, 'verify.stamp')
+
+# 脚本导入的本地模块及其读取的文件同样是输入：load_table 依赖 data_schema.py、normalize_inputs.py
+# 和规范化后的数据字典；fill_cold_start 来自 country_similarity.py
+SCHEMA_INPUTS = ['data_schema.py', 'normalize_inputs.py', CANONICAL_DICTIONARY]
+SIMILARITY_INPUTS = SCHEMA_INPUTS + ['country_similarity.py']
+
+# 节点名 -> (脚本, 输入文件, 输出文件)
+STAGES = {
+    'normalize': ('normalize_inputs.py', RAW_FILES + ['data_dictionary.csv'],
+                  CANONICAL_FILES + [CANONICAL_DICTIONARY]),
+    'cleaning': ('data_cleaning.py', CANONICAL_FILES + ['normalize_inputs.py'], CLEANED_FILES),
+    'athlete_index': ('athlete_index.py', ['summerOly_athletes_cleaned.csv'] + SCHEMA_INPUTS,
+                      ['athlete_index.npz', 'athlete_index_keys.csv', 'athlete_careers.csv',
+                       'athlete_career_features.csv']),
+    'features': ('complete_data_processing.py', CLEANED_FILES + SCHEMA_INPUTS + ['athlete_index.py'],
+                 [FEATURES_FILE]),
+    'verify': ('verify_features.py', [FEATURES_FILE, 'summerOly_medal_counts_cleaned.csv',
+                                      'summerOly_athletes_cleaned.csv'] + SCHEMA_INPUTS, [VERIFY_STAMP]),
+    'changepoints': ('coach_changepoints.py', ['summerOly_athletes_cleaned.csv'] + SCHEMA_INPUTS,
+                     ['coach_changepoints.csv']),
+    'similarity': ('country_similarity.py', [FEATURES_FILE, 'summerOly_programs_cleaned.csv'] + SCHEMA_INPUTS,
+                   ['country_neighbors.csv']),
+    'modeling': ('modeling_strategy.py',
+                 [FEATURES_FILE, 'summerOly_programs_cleaned.csv', VERIFY_STAMP] + SIMILARITY_INPUTS,
+                 [MODEL_FILE, '2024_prediction_results.csv', 'model_feature_importance.csv']),
+    'explainability': ('model_explainability.py',
+                       [MODEL_FILE, FEATURES_FILE, 'summerOly_programs_cleaned.csv', VERIFY_STAMP]
+                       + SIMILARITY_INPUTS,
+                       ['explain_permutation_importance.csv', 'explain_partial_dependence.csv',
+                        'explain_ice_curves.csv']),
+    'scenarios': ('scenario_engine.py',
+                  [MODEL_FILE, FEATURES_FILE, 'summerOly_programs_cleaned.csv', VERIFY_STAMP] + SIMILARITY_INPUTS,
+                  ['scenario_results.csv']),
+    'reconciliation': ('reconciliation.py',
+                       ['2024_prediction_results.csv', 'summerOly_athletes_cleaned.csv',
+                        os.path.join('canonical', 'summerOly_medal_counts.csv'), 'summerOly_programs_cleaned.csv']
+                       + SCHEMA_INPUTS,
+                       ['reconciled_medal_table.csv', 'reconciled_discipline_medals.csv']),
+    'report': ('report_rendering.py',
+               ['2024_prediction_results.csv', 'model_feature_importance.csv',
+                'explain_permutation_importance.csv', 'explain_partial_dependence.csv', 'explain_ice_curves.csv'],
+               ['model_eval_scatter.png', 'model_feature_importance.png', 'model_top15_compare.png',
+                '2024_prediction_report.txt', 'model_permutation_importance.png', 'model_partial_dependence.png']),
+}
+
+
+def stamp_path(name):
+    return os.path.join(LOG_DIR, f'{name}.stamp')
+
+
+def build_graph(stages=STAGES):
+    """返回 {节点: 上游节点集合}；同一文件被多个节点产出时报错。"""
+    producer = {}
+    for name, (_, _, outputs) in stages.items():
+        for path in outputs:
+            if path in producer:
+                raise ValueError(f"{path} 同时由 {producer[path]} 和 {name} 产出")
+            producer[path] = name
+    upstream = {name: {producer[path] for path in inputs if path in producer}
+                for name, (_, inputs, _) in stages.items()}
+    # 拓扑排序检查环
+    order, remaining = [], dict(upstream)
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps - set(order)]
+        if not ready:
+            raise ValueError(f"依赖图中存在环: {sorted(remaining)}")
+        order.extend(ready)
+        for name in ready:
+            del remaining[name]
+    return upstream, order
+
+
+def is_fresh(name, script, inputs, outputs):
+    """全部输出存在，且上次成功运行的标记不早于最新的输入（含脚本本身）。
+
+    以标记而不是输出的修改时间判断：脚本可能因内容未变而不重写输出（如 report_rendering.py 的增量渲染）。"""
+    stamp = stamp_path(name)
+    if not all(os.path.exists(path) for path in outputs + [stamp]):
+        return False
+    newest_input = max(os.path.getmtime(path) for path in inputs + [script] if os.path.exists(path))
+    return os.path.getmtime(stamp) >= newest_input
+
+
+def run_node(name, script, t0):
+    """在子进程中运行脚本，输出写入 pipeline_logs/<节点>.log，返回 (退出码, 相对 t0 的开始时间, 耗时)。
+
+    运行前删除旧标记，仅在退出码为 0 时重新写入，失败或中断的节点下次一定重跑。"""
+    stamp = stamp_path(name)
+    if os.path.exists(stamp):
+        os.remove(stamp)
+    start = time.perf_counter()
+    with open(os.path.join(LOG_DIR, f'{name}.log'), 'w', encoding='utf-8') as log:
+        status = subprocess.run([sys.executable, script], stdout=log, stderr=subprocess.STDOUT).returncode
+    if status == 0:
+        with open(stamp, 'w', encoding='utf-8') as f:
+            f.write(f"{script} {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    return status, start - t0, time.perf_counter() - start
+
+
+def run_pipeline(stages=STAGES, jobs=None, force=False):
+    """按依赖关系并发运行全部节点，返回 {节点: {'status', 'start', 'seconds'}}。
+
+    status 取值: ran / skipped / failed / blocked（上游失败）/ missing（缺少非生成的输入文件）。"""
+    upstream, order = build_graph(stages)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    results = {}
+    pending = list(order)
+    running = {}
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while pending or running:
+            for name in list(pending):
+                deps = upstream[name]
+                if not deps <= results.keys():
+                    continue
+                pending.remove(name)
+                script, inputs, outputs = stages[name]
+                if any(results[dep]['status'] in ('failed', 'blocked', 'missing') for dep in deps):
+                    results[name] = {'status': 'blocked', 'start': 0.0, 'seconds': 0.0}
+                    continue
+                # 上游本轮重新运行过时，本节点的输入已更新，自然不会被判为最新
+                if not force and is_fresh(name, script, inputs, outputs):
+                    results[name] = {'status': 'skipped', 'start': time.perf_counter() - t0, 'seconds': 0.0}
+                    print(f"  - {name}: 输出已是最新，跳过")
+                    continue
+                missing = [path for path in inputs if not os.path.exists(path)]
+                if missing:
+                    results[name] = {'status': 'missing', 'start': 0.0, 'seconds': 0.0}
+                    print(f"  ✗ {name}: 缺少输入 {missing}")
+                    continue
+                print(f"  → {name}: 开始运行 {script}")
+                running[pool.submit(run_node, name, script, t0)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                status, start, seconds = future.result()
+                results[name] = {'status': 'ran' if status == 0 else 'failed', 'start': start, 'seconds': seconds}
+                mark = '✓' if status == 0 else '✗'
+                print(f"  {mark} {name}: {seconds:.1f} 秒" + ('' if status == 0 else f"（退出码 {status}，见 {LOG_DIR}/{name}.log）"))
+
+    wall = time.perf_counter() - t0
+    return results, upstream, order, wall
+
+
+def critical_path(results, upstream, order):
+    """按本次实际耗时求最长依赖链，返回 (节点列表, 总耗时)。"""
+    finish, previous = {}, {}
+    for name in order:
+        best = max(upstream[name], key=lambda dep: finish[dep], default=None)
+        finish[name] = (finish[best] if best else 0.0) + results[name]['seconds']
+        previous[name] = best
+    node = max(finish, key=finish.get)
+    path = []
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return path[::-1], max(finish.values())
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("流水线调度 (DAG)")
+    print("=" * 80)
+
+    args = sys.argv[1:]
+    force = '--force' in args
+    jobs = int(args[args.index('--jobs') + 1]) if '--jobs' in args else None
+
+    print()
+    results, upstream, order, wall = run_pipeline(jobs=jobs, force=force)
+
+    # ============== 汇总 ==============
+    print("\n" + "=" * 80)
+    print("运行汇总")
+    print("=" * 80)
+    print(f"{'节点':<16}{'状态':<10}{'开始(秒)':>10}{'耗时(秒)':>10}  上游")
+    for name in order:
+        r = results[name]
+        print(f"{name:<16}{r['status']:<10}{r['start']:>10.1f}{r['seconds']:>10.1f}  {', '.join(sorted(upstream[name])) or '-'}")
+
+    path, path_seconds = critical_path(results, upstream, order)
+    serial_seconds = sum(r['seconds'] for r in results.values())
+    print(f"\n关键路径: {' → '.join(path)}  ({path_seconds:.1f} 秒)")
+    print(f"各节点耗时之和: {serial_seconds:.1f} 秒，实际墙钟时间: {wall:.1f} 秒")
+
+    failed = [name for name, r in results.items() if r['status'] in ('failed', 'blocked', 'missing')]
+    if failed:
+        print(f"\n未完成的节点: {', '.join(failed)}")
+        print("=" * 80)
+        sys.exit(1)
+    print("\n流水线完成! ✓")
+    print("=" * 80)
@@ -0,0 +1,181 @@
+import sys
+import time
+
+import pandas as pd
+import numpy as np
+import joblib
+from data_schema import load_table
+from country_similarity import fill_cold_start
+
+# 批量情景分析 (What-if)：主办国、代表团规模、赛事设置变化对2028年奖牌的影响
+# 以2024年各参赛国的数据外推出2028年基准特征矩阵，情景表中的每一行是一个特征扰动：
+#   Scenario, NOC, Feature, Op, Value
+#   - NOC 为 '*' 时作用于全部国家（如赛事设置变化）
+#   - Op: set（直接赋值）/ scale（乘以系数）/ add（加上增量），同一情景内按 set -> scale -> add 的顺序生效
+# 全部情景先在 (情景数, 国家数, 特征数) 张量上以向量化方式叠加，
+# 再拼成一个矩阵，对 model_artifacts.joblib 中的6个模型各做一次批量预测。
+# 用法: python scenario_engine.py [scenarios.csv]
+
+BASE_YEAR = 2024
+TARGET_YEAR = 2028
+TARGET_HOST = 'USA'   # Los Angeles 2028
+BASELINE = 'baseline'
+OPS = ['set', 'scale', 'add']
+
+# 特征的取值范围，扰动后统一截断
+FEATURE_BOUNDS = {
+    'Is_Host': (0, 1),
+    'Female_Ratio': (0, 1),
+    'Athlete_Count': (0, None),
+    'Sport_Count': (0, None),
+    'Event_Count': (0, None),
+    'Avg_Sport_Efficiency': (0, None),
+}
+
+
+def base_matrix(df, features, base_year=BASE_YEAR, host=TARGET_HOST):
+    """由 base_year 的数据外推下一届的特征：本届奖牌成为 Lag_1，本届 Lag_k 成为 Lag_(k+1)，
+    参赛规模与效率沿用本届，主办国换成 host。返回 (nocs, 特征矩阵)。"""
+    current = df[(df['Year'] == base_year) & (df['Athlete_Count'] > 0)].reset_index(drop=True)
+    projected = current.copy()
+    for medal in ['Gold', 'Total']:
+        projected[f'Lag_3_{medal}'] = current[f'Lag_2_{medal}']
+        projected[f'Lag_2_{medal}'] = current[f'Lag_1_{medal}']
+        projected[f'Lag_1_{medal}'] = current[f'{medal}_Medals']
+        projected[f'Avg_3yr_{medal}'] = projected[[f'Lag_1_{medal}', f'Lag_2_{medal}', f'Lag_3_{medal}']].mean(axis=1)
+    projected['Is_Host'] = (current['NOC'].astype(str) == host).astype(int)
+    return current['NOC'].astype(str).to_numpy(), projected[features].fillna(0).to_numpy(dtype=float)
+
+
+def apply_scenarios(base, nocs, features, scenarios):
+    """把情景表作用到基准矩阵上，返回 (情景名, 张量 (情景数, 国家数, 特征数))。
+
+    基准情景 'baseline' 总是排在第0位。"""
+    if (scenarios['Scenario'] == BASELINE).any():
+        raise ValueError(f"情景名 '{BASELINE}' 保留给基准情景")
+    names = [BASELINE] + list(pd.unique(scenarios['Scenario']))
+    tensor = np.tile(base, (len(names), 1, 1))
+
+    unknown = set(scenarios['Feature']) - set(features)
+    if unknown:
+        raise ValueError(f"情景中包含模型未使用的特征: {sorted(unknown)}")
+    unknown = set(scenarios['Op']) - set(OPS)
+    if unknown:
+        raise ValueError(f"未知的操作类型: {sorted(unknown)}，可选: {OPS}")
+    # 不在基准矩阵中的国家（拼写错误或2024年未参赛）会让扰动静默失效，情景与基准无异
+    unknown = set(scenarios['NOC']) - set(nocs) - {'*'}
+    if unknown:
+        raise ValueError(f"情景中包含不在 {BASE_YEAR} 年基准矩阵中的 NOC: {sorted(unknown)}")
+
+    # '*' 展开为全部国家
+    all_rows = scenarios['NOC'] == '*'
+    expanded = pd.concat([
+        scenarios[~all_rows],
+        scenarios[all_rows].drop(columns='NOC').merge(pd.DataFrame({'NOC': nocs}), how='cross'),
+    ], ignore_index=True)
+    s = pd.Index(names).get_indexer(expanded['Scenario'])
+    n = pd.Index(nocs).get_indexer(expanded['NOC'])
+    f = pd.Index(features).get_indexer(expanded['Feature'])
+    value = expanded['Value'].to_numpy(dtype=float)
+    op = expanded['Op'].to_numpy()
+
+    is_set = op == 'set'
+    tensor[s[is_set], n[is_set], f[is_set]] = value[is_set]
+    is_scale = op == 'scale'
+    np.multiply.at(tensor, (s[is_scale], n[is_scale], f[is_scale]), value[is_scale])
+    is_add = op == 'add'
+    np.add.at(tensor, (s[is_add], n[is_add], f[is_add]), value[is_add])
+
+    for feature, (low, high) in FEATURE_BOUNDS.items():
+        if feature in features:
+            col = features.index(feature)
+            tensor[:, :, col] = np.clip(tensor[:, :, col], low, high)
+    return names, tensor
+
+
+def score_scenarios(artifacts, names, nocs, tensor):
+    """一次批量预测全部情景，返回每个 (情景, 国家) 的奖牌预测及相对基准情景的变化。"""
+    features = artifacts['features']
+    n_scenario, n_noc, n_feature = tensor.shape
+    X = pd.DataFrame(tensor.reshape(-1, n_feature), columns=features)
+
+    results = pd.DataFrame({
+        'Scenario': np.repeat(names, n_noc),
+        'NOC': np.tile(nocs, n_scenario),
+    })
+    for target, prefix in [('Gold_Medals', 'Gold'), ('Total_Medals', 'Total')]:
+        models = artifacts['models'][target]
+        pred = np.maximum(models['main'].predict(X), 0)
+        results[f'Pred_{prefix}'] = pred
+        results[f'{prefix}_Lower'] = np.maximum(models['lower'].predict(X), 0)
+        results[f'{prefix}_Upper'] = models['upper'].predict(X)
+        # 基准情景位于前 n_noc 行
+        results[f'{prefix}_Change'] = pred - np.tile(pred[:n_noc], n_scenario)
+    return results
+
+
+def run_scenarios(scenarios, artifacts=None, df=None):
+    """情景表 -> 每个情景的奖牌预测表。"""
+    if artifacts is None:
+        artifacts = joblib.load('model_artifacts.joblib')
+    if df is None:
+        df, _ = fill_cold_start(load_table('features'), load_table('programs'))  # 与训练时的特征处理一致
+    features = artifacts['features']
+    nocs, base = base_matrix(df, features)
+    names, tensor = apply_scenarios(base, nocs, features, scenarios)
+    return score_scenarios(artifacts, names, nocs, tensor)
+
+
+def host_sweep(host=TARGET_HOST, athlete_scales=np.linspace(0.8, 1.3, 11), event_scales=(1.0, 1.05)):
+    """示例情景：host 主办与否 × 代表团规模缩放 × 赛事总数变化。"""
+    rows = []
+    for hosting in [1, 0]:
+        for athlete_scale in athlete_scales:
+            for event_scale in event_scales:
+                name = f"host={hosting}|athletes={athlete_scale:.2f}|events={event_scale:.2f}"
+                rows.append((name, host, 'Is_Host', 'set', hosting))
+                rows.append((name, host, 'Athlete_Count', 'scale', athlete_scale))
+                rows.append((name, '*', 'Event_Count', 'scale', event_scale))
+    return pd.DataFrame(rows, columns=['Scenario', 'NOC', 'Feature', 'Op', 'Value'])
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print(f"{TARGET_YEAR}年批量情景分析 (What-if)")
+    print("=" * 80)
+
+    # ============== 第1步：加载模型与情景 ==============
+    print("\n[Step 1] 加载模型与情景表...")
+
+    artifacts = joblib.load('model_artifacts.joblib')
+    if len(sys.argv) > 1:
+        scenarios = pd.read_csv(sys.argv[1], encoding='utf-8')
+        print(f"  ✓ 情景表: {sys.argv[1]}")
+    else:
+        scenarios = host_sweep()
+        print(f"  ✓ 未指定情景表，使用示例：{TARGET_HOST} 主办 × 代表团规模 × 赛事数")
+    print(f"  ✓ {scenarios['Scenario'].nunique()} 个情景，{len(scenarios)} 条扰动")
+
+    # ============== 第2步：批量预测 ==============
+    print("\n[Step 2] 向量化叠加扰动并批量预测...")
+
+    start = time.perf_counter()
+    results = run_scenarios(scenarios, artifacts)
+    elapsed = time.perf_counter() - start
+    print(f"  ✓ {len(results)} 行 (情景 × 国家)，耗时 {elapsed:.2f} 秒")
+
+    # ============== 第3步：保存 ==============
+    print("\n[Step 3] 保存结果...")
+
+    results.to_csv('scenario_results.csv', index=False, encoding='utf-8')
+    print("  ✓ scenario_results.csv")
+
+    # ============== 报告 ==============
+    print("\n" + "=" * 80)
+    print(f"{TARGET_HOST} 在各情景下的预测")
+    print("=" * 80)
+    summary = results[results['NOC'] == TARGET_HOST].drop(columns='NOC')
+    print(summary.round(2).to_string(index=False))
+
+    print("\n情景分析完成! ✓")
+    print("=" * 80)
@@ -0,0 +1,96 @@
+import os
+import sys
+import shutil
+import subprocess
+
+import pandas as pd
+import numpy as np
+import pytest
+
+from duckdb_features import OUTPUT_FILE, assert_same_features, build_features_duckdb
+
+# duckdb_features.py 与 pandas 路径 (complete_data_processing.py) 的一致性测试
+# SQL 有意复刻了 pandas 路径的细节（rolling(3) 不按国家分区、同一 Team 以最后出现的 NOC 为准等），
+# 任何一侧改动而另一侧未跟上时，这里会失败。
+# 用法: python -m pytest -q test_duckdb_features.py
+
+duckdb = pytest.importorskip('duckdb')
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# 从仓库复制的真实小表
+STATIC_FILES = ['summerOly_hosts_cleaned.csv', 'summerOly_programs_cleaned.csv', 'data_dictionary.csv']
+
+YEARS = [2008, 2012, 2016, 2020, 2024]
+# NOC -> (运动员表中的 Team, 奖牌榜中的国家名)
+COUNTRIES = {
+    'USA': ('United States', 'United States'),   # special_mappings
+    'GBR': ('Great Britain', 'Great Britain'),
+    'CHN': ('China', 'China'),
+    'FRA': ('France', 'france'),                 # 只能按小写名称匹配
+    'BRA': ('Brazil', 'BRA'),                    # 奖牌榜中直接是代码
+    'XYZ': ('Unified Team', 'Unified Team'),     # Team 先后对应 EUN 与 XYZ，以最后出现的组合为准
+}
+SPORTS = {'Swimming': 6, 'Athletics': 8, 'Judo': 3}
+
+
+def write_fixture(workdir, seed=0, rows_per_year=120):
+    """写出小规模的清洗后运动员表与奖牌榜，覆盖名称映射、重复参赛记录与多届职业生涯。"""
+    rng = np.random.default_rng(seed)
+    nocs = np.array(list(COUNTRIES))
+    frames = []
+    for year in YEARS:
+        noc = nocs[rng.integers(0, len(nocs), rows_per_year)]
+        sport = np.array(list(SPORTS))[rng.integers(0, len(SPORTS), rows_per_year)]
+        event = [f"{s} Event {rng.integers(1, SPORTS[s] + 1)}" for s in sport]
+        # 每个 NOC 的运动员从固定的小名单中抽取，跨届重复出现
+        name = np.char.add(np.char.add(noc, ' Athlete '), rng.integers(0, 25, rows_per_year).astype(str))
+        frames.append(pd.DataFrame({
+            'Name': name,
+            'Sex': np.where(rng.random(rows_per_year) < 0.4, 'F', 'M'),
+            'Team': [COUNTRIES[code][0] for code in noc],
+            'NOC': noc,
+            'Year': year,
+            'City': f'City {year}',
+            'Sport': sport,
+            'Event': event,
+            'Medal': rng.choice(['Gold', 'Silver', 'Bronze', 'No medal'], rows_per_year, p=[.1, .1, .1, .7]),
+        }))
+    athletes = pd.concat(frames, ignore_index=True)
+    # 'Unified Team' 先以 EUN 出现，之后才以 XYZ 出现
+    athletes.loc[0, ['Team', 'NOC']] = ['Unified Team', 'EUN']
+    athletes = pd.concat([athletes.iloc[:1], athletes[athletes['NOC'] != 'EUN']], ignore_index=True)
+    # 同一 (NOC, Year, Name) 的多条记录（多个小项）
+    athletes = pd.concat([athletes, athletes.iloc[5:15].assign(Event='Athletics Event 1')], ignore_index=True)
+    athletes['Is_Medal_Unit'] = (athletes['Medal'] != 'No medal') & ~athletes.duplicated(['NOC', 'Year', 'Event', 'Medal'])
+
+    units = athletes[athletes['Is_Medal_Unit']]
+    medal_counts = pd.crosstab([units['NOC'], units['Year']], units['Medal'])
+    medal_counts = medal_counts.reindex(columns=['Gold', 'Silver', 'Bronze'], fill_value=0).reset_index()
+    medal_counts = medal_counts[medal_counts['NOC'] != 'EUN']
+    medal_counts['NOC'] = medal_counts['NOC'].map(lambda code: COUNTRIES[code][1])
+    # 没有运动员记录、也无法映射的国家名称原样保留
+    medal_counts = pd.concat([medal_counts, pd.DataFrame({'NOC': ['Atlantis'], 'Year': [2016],
+                                                          'Gold': [1], 'Silver': [0], 'Bronze': [2]})])
+    medal_counts['Total'] = medal_counts[['Gold', 'Silver', 'Bronze']].sum(axis=1)
+    medal_counts['Rank'] = medal_counts.groupby('Year')['Gold'].rank(method='min', ascending=False).astype(int)
+
+    athletes.to_csv(os.path.join(workdir, 'summerOly_athletes_cleaned.csv'), index=False)
+    medal_counts[['Rank', 'NOC', 'Gold', 'Silver', 'Bronze', 'Total', 'Year']].to_csv(
+        os.path.join(workdir, 'summerOly_medal_counts_cleaned.csv'), index=False
+    )
+    for name in STATIC_FILES:
+        shutil.copy(os.path.join(HERE, name), workdir)
+
+
+def test_duckdb_matches_pandas_path(tmp_path, monkeypatch):
+    write_fixture(tmp_path)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([HERE, os.environ.get('PYTHONPATH', '')]))
+    subprocess.run([sys.executable, os.path.join(HERE, 'complete_data_processing.py')], cwd=tmp_path,
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+    pandas_df = pd.read_csv(tmp_path / OUTPUT_FILE)
+
+    monkeypatch.chdir(tmp_path)
+    duck_df = build_features_duckdb(database=str(tmp_path / 'olympics.duckdb'), threads=1)
+
+    assert len(pandas_df) == len(YEARS) * (len(COUNTRIES) + 2)   # 另有 EUN 与 Atlantis
+    assert_same_features(pandas_df, duck_df)
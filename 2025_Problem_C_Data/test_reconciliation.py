@@ -0,0 +1,126 @@
+import os
+
+import pandas as pd
+import numpy as np
+import pytest
+
+from data_schema import load_table
+from reconciliation import (TARGETS, INTERVAL_Z, load_unfiltered_medal_counts, medals_per_event,
+                            programme_disciplines, reconcile, reconcile_nonnegative, reconcile_target,
+                            summing_matrix)
+
+# reconciliation.py 的回归测试
+# 用法: python -m pytest -q test_reconciliation.py
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 合成的赛事设置：(大项, 分项, 小项数)；Aquatics 下有两个分项，覆盖分项 → 大项的聚合层
+PROGRAMME = [('Aquatics', 'Swimming', 30), ('Aquatics', 'Diving', 8), ('Athletics', 'Athletics', 40),
+             ('Cycling', 'Cycling', 12), ('Judo', 'Judo', 14), ('Rowing', 'Rowing', 10)]
+HISTORY_YEARS = [2012, 2016, 2020]
+HOLDOUT_YEAR = 2024
+
+
+def synthetic_holdout(seed, n_noc=15):
+    """各国在每个分项上有固定的实力份额，历届奖牌按份额随机分配；
+    NOC 层的"模型预测"为留出届真实值加上与区间宽度一致的噪声。"""
+    rng = np.random.default_rng(seed)
+    nocs = [f'N{i:02d}' for i in range(n_noc)]
+    strength = rng.dirichlet(np.full(n_noc, 0.6), size=len(PROGRAMME))   # (分项数, NOC数)
+
+    programs_df = pd.DataFrame({
+        'Sport': [sport for sport, _, _ in PROGRAMME],
+        'Discipline': [discipline for _, discipline, _ in PROGRAMME],
+        **{str(year): [events for _, _, events in PROGRAMME] for year in HISTORY_YEARS + [HOLDOUT_YEAR]},
+    })
+
+    units, holdout = [], np.zeros((n_noc, 2))
+    for year in HISTORY_YEARS + [HOLDOUT_YEAR]:
+        for (_, discipline, events), share in zip(PROGRAMME, strength):
+            for medal in ['Gold', 'Silver', 'Bronze']:
+                winners = rng.choice(n_noc, size=events, p=share)
+                if year == HOLDOUT_YEAR:
+                    np.add.at(holdout[:, 1], winners, 1)
+                    if medal == 'Gold':
+                        np.add.at(holdout[:, 0], winners, 1)
+                else:
+                    units.append(pd.DataFrame({'NOC': np.array(nocs)[winners], 'Year': year,
+                                               'Sport': discipline, 'Medal': medal}))
+    athletes_df = pd.concat(units, ignore_index=True).assign(Is_Medal_Unit=True)
+
+    results = pd.DataFrame({'NOC': nocs, 'Year': HOLDOUT_YEAR,
+                            'Gold_Medals': holdout[:, 0], 'Total_Medals': holdout[:, 1]})
+    for target, (pred_col, lower_col, upper_col, _) in TARGETS.items():
+        truth = results[f'{target}_Medals'].to_numpy()
+        sd = 0.3 * truth + 1.0
+        results[pred_col] = np.maximum(truth + rng.normal(0, sd), 0)
+        results[lower_col] = np.maximum(results[pred_col] - INTERVAL_Z * sd, 0)
+        results[upper_col] = results[pred_col] + INTERVAL_Z * sd
+    return results, athletes_df, programs_df
+
+
+def test_reconciliation_does_not_increase_holdout_error():
+    """单次留出的误差有随机性，按多个随机世界的平均 MAE 比较。"""
+    errors = {target: [] for target in TARGETS}
+    for seed in range(10):
+        results, athletes_df, programs_df = synthetic_holdout(seed)
+        disciplines = programme_disciplines(programs_df, HOLDOUT_YEAR)
+        events = disciplines['Events'].to_numpy(dtype=float)
+        available = {'Gold': events, 'Total': events * 3}
+
+        for target in TARGETS:
+            countries, _, diagnostics = reconcile_target(target, results, athletes_df, disciplines,
+                                                         available[target], HOLDOUT_YEAR)
+            truth = results[f'{target}_Medals'].to_numpy()
+            errors[target].append((np.abs(countries[f'Pred_{target}'].to_numpy() - truth).mean(),
+                                   np.abs(countries[f'Reconciled_{target}'].to_numpy() - truth).mean()))
+            assert diagnostics['reconciled_sum'] == pytest.approx(available[target].sum(), rel=1e-3)
+
+    for target, pairs in errors.items():
+        mae_before, mae_after = np.mean(pairs, axis=0)
+        assert mae_after <= mae_before, f"{target}: MAE {mae_before:.3f} → {mae_after:.3f}"
+
+
+def small_hierarchy(bottom, noc_base):
+    """2 个 NOC × 3 个分项（各属不同大项）的求和矩阵与基础预测；聚合层按底层求和，NOC 层另给。"""
+    S = summing_matrix(2, np.array([0, 1, 2]), 3)
+    per_discipline = bottom.reshape(2, 3).sum(axis=0)
+    base = np.concatenate([bottom, noc_base, per_discipline, per_discipline, [bottom.sum()]])
+    return S, base, np.ones(len(base))
+
+
+def test_nonnegative_raises_when_negatives_remain_after_max_rounds():
+    # NOC 层预测与底层严重冲突，首轮解中有负值，需要第二轮重解
+    S, base, variance = small_hierarchy(np.array([5, 0.1, 0.1, 0.1, 5, 0.1]), [10, 0.1])
+    with pytest.raises(RuntimeError):
+        reconcile_nonnegative(S, base, variance, max_rounds=1)
+
+    solution, _, rounds = reconcile_nonnegative(S, base, variance)
+    assert rounds > 1
+    assert (solution >= 0).all()
+    # 负值序列固定为0后重解，其余序列吸收差额，结果不同于直接截断无约束解
+    clipped = np.maximum(reconcile(S, base, variance)[0], 0)
+    assert not np.allclose(solution, clipped)
+
+
+def test_nonnegative_all_series_fixed_at_zero():
+    bottom = -np.ones(6)
+    S, base, variance = small_hierarchy(bottom, bottom.reshape(2, 3).sum(axis=1))
+    solution, _, rounds = reconcile_nonnegative(S, base, variance)
+    assert rounds == 1
+    assert (solution == 0).all()
+
+
+def test_medals_per_event_uses_unfiltered_medal_table(monkeypatch):
+    """清洗后的奖牌榜删除/合并了部分 NOC，由其推出的可发奖牌数明显低于实际颁发数。"""
+    monkeypatch.chdir(HERE)
+    programs_df = load_table('programs')
+    events = programme_disciplines(programs_df, 2024)['Events'].sum()
+    raw = load_unfiltered_medal_counts()
+    actual_2024 = raw.loc[raw['Year'] == 2024, 'Total'].sum()
+
+    available = events * medals_per_event(raw, programs_df, 2024)
+    assert available == pytest.approx(actual_2024, rel=0.02)
+
+    cleaned = events * medals_per_event(load_table('medal_counts'), programs_df, 2024)
+    assert cleaned < available
@@ -1,82 +1,146 @@
+import sys
+import time
+
 import pandas as pd
 import numpy as np
-
-print("\n" + "="*80)
-print("特征数据集验证报告")
-print("="*80)
-
-df = pd.read_csv('country_year_features.csv')
-
-print(f"\n【基础信息】")
-print(f"总行数: {len(df)}")
-print(f"总列数: {len(df.columns)}")
-print(f"数据类型: {df.shape}")
-
-print(f"\n【列名】")
-for i, col in enumerate(df.columns, 1):
-    print(f"{i:2d}. {col}")
-
-print(f"\n【数据范围】")
-print(f"国家数: {df['NOC'].nunique()}")
-print(f"年份范围: {df['Year'].min()} - {df['Year'].max()}")
-print(f"年份数: {df['Year'].nunique()}")
-
-print(f"\n【2024年参赛国（前15名）】")
-df_2024 = df[df['Year'] == 2024].copy()
-print(f"2024年参赛国总数: {len(df_2024[df_2024['Athlete_Count'] > 0])}")
-print(f"2024年获得奖牌的国家: {len(df_2024[df_2024['Total_Medals'] > 0])}")
-
-top_15 = df_2024.nlargest(15, 'Gold_Medals')[['NOC', 'Gold_Medals', 'Total_Medals', 'Athlete_Count', 'Is_Host']]
-print(top_15.to_string(index=False))
-
-print(f"\n【2024年关键国家检验】")
-for country in ['CHN', 'USA', 'JPN', 'AUS', 'FRA']:
-    row = df_2024[df_2024['NOC'] == country]
-    if len(row) > 0:
-        print(f"{country}: {row['Gold_Medals'].values[0]:.0f}金 {row['Total_Medals'].values[0]:.0f}总 "
-              f"({row['Athlete_Count'].values[0]:.0f}名运动员) Host={row['Is_Host'].values[0]:.0f}")
-
-print(f"\n【特征缺失值统计】")
-missing = df.isnull().sum()
-if missing.sum() > 0:
-    print("有缺失值的列:")
-    for col in missing[missing > 0].index:
-        print(f"  {col}: {missing[col]} ({missing[col]/len(df)*100:.1f}%)")
-else:
-    print("  无缺失值 ✓")
-
-print(f"\n【数值特征统计】")
-numeric_cols = ['Gold_Medals', 'Total_Medals', 'Athlete_Count', 'Avg_3yr_Gold', 'Avg_Sport_Efficiency']
-stats = df[numeric_cols].describe()
-print(stats)
-
-print(f"\n【分类特征统计】")
-print(f"Is_Host: {df['Is_Host'].value_counts().to_dict()}")
-
-print(f"\n【历史数据示例 - 中国（CHN）】")
-china = df[df['NOC'] == 'CHN'].sort_values('Year')
-print(china[['Year', 'Gold_Medals', 'Total_Medals', 'Athlete_Count']].tail(8).to_string(index=False))
-
-print(f"\n【历史数据示例 - 美国（USA）】")
-usa = df[df['NOC'] == 'USA'].sort_values('Year')
-print(usa[['Year', 'Gold_Medals', 'Total_Medals', 'Athlete_Count']].tail(8).to_string(index=False))
-
-print(f"\n【东道主效应分析】")
-host_years = df[df['Is_Host'] == 1][['Year', 'NOC', 'Gold_Medals', 'Total_Medals']].sort_values('Year')
-if len(host_years) > 0:
-    print(f"识别的主办国（共{len(host_years)}条）:")
-    print(host_years.to_string(index=False))
-    
-    # 比较主办国与非主办国的平均奖牌数
-    hosts_avg = df[df['Is_Host'] == 1]['Total_Medals'].mean()
-    non_hosts_avg = df[df['Is_Host'] == 0]['Total_Medals'].mean()
-    print(f"\n主办国平均奖牌数: {hosts_avg:.2f}")
-    print(f"非主办国平均奖牌数: {non_hosts_avg:.2f}")
-    print(f"东道主溢价: {(hosts_avg/non_hosts_avg - 1)*100:.1f}%")
-
-print(f"\n【特征相关性（与Total_Medals）】")
-correlations = df[['Gold_Medals', 'Lag_1_Gold', 'Lag_1_Total', 'Athlete_Count', 'Sport_Count', 'Total_Medals']].corr()['Total_Medals'].sort_values(ascending=False)
-print(correlations[correlations.index != 'Total_Medals'])
-
-print(f"\n验证完成! ✓")
-print("="*80 + "\n")
+from data_schema import load_table
+
+# 数据一致性检查：声明式的不变量，全部以向量化运算一次性完成
+# 每个检查声明所需的表，返回违反不变量的行（空表即通过）；任一检查失败时以非零状态退出，
+# 因此可以作为各阶段之间的门禁：
+#   python complete_data_processing.py && python verify_features.py && python modeling_strategy.py
+
+MODEL_START_YEAR = 1996          # 与 modeling_strategy.py 的训练窗口一致
+MODEL_FEATURES = [
+    'Lag_1_Total', 'Lag_1_Gold', 'Lag_2_Total', 'Athlete_Count', 'Is_Host',
+    'Sport_Count', 'Event_Count', 'Avg_Sport_Efficiency', 'Female_Ratio',
+]
+# 运动员表按 (Year, NOC, Event, Medal) 去重后的奖牌单位数与奖牌榜之间存在少量已知差异
+# （并列名次、事后取消的成绩等），按年允许的相对误差
+ATHLETE_MEDAL_TOLERANCE = 0.05
+
+# 只读取检查需要的列
+TABLE_COLUMNS = {
+    'features': ['NOC', 'Year', 'Gold_Medals', 'Total_Medals'] + MODEL_FEATURES,
+    'medal_counts': ['NOC', 'Year', 'Gold', 'Silver', 'Bronze', 'Total'],
+    'athletes': ['Year', 'Is_Medal_Unit'],
+}
+
+
+def check_noc_codes(features):
+    """特征表中有奖牌的 NOC 必须是三位大写代码（奖牌榜国家名未映射时会原样留下）。"""
+    valid = features['NOC'].astype(str).str.fullmatch(r'[A-Z]{3}')
+    bad = features[~valid & (features['Total_Medals'] > 0)]
+    return bad.groupby('NOC', observed=True)['Total_Medals'].sum().reset_index()
+
+
+def check_features_vs_medal_counts(features, medal_counts):
+    """按年汇总的金牌/总奖牌数与奖牌榜一致（映射与合并没有丢失记录）。"""
+    ours = features.groupby('Year')[['Gold_Medals', 'Total_Medals']].sum()
+    theirs = medal_counts.groupby('Year')[['Gold', 'Total']].sum()
+    merged = ours.join(theirs, how='outer').fillna(0)
+    diff = (merged['Gold_Medals'] != merged['Gold']) | (merged['Total_Medals'] != merged['Total'])
+    return merged[diff].reset_index()
+
+
+def check_athletes_vs_medal_counts(athletes, medal_counts):
+    """按年统计运动员表的奖牌单位数，与奖牌榜总数的相对误差不超过容差。"""
+    units = athletes.groupby('Year')['Is_Medal_Unit'].sum().rename('Athlete_Medal_Units')
+    totals = medal_counts.groupby('Year')['Total'].sum()
+    merged = pd.concat([units, totals], axis=1).fillna(0)
+    relative = (merged['Athlete_Medal_Units'] - merged['Total']).abs() / merged['Total'].clip(lower=1)
+    return merged.assign(Relative_Diff=relative)[relative > ATHLETE_MEDAL_TOLERANCE].reset_index()
+
+
+def check_gold_le_total(features, medal_counts):
+    """金牌数不超过总奖牌数，且奖牌榜中 金+银+铜 = 总数。"""
+    bad_features = features.loc[features['Gold_Medals'] > features['Total_Medals'],
+                                ['NOC', 'Year', 'Gold_Medals', 'Total_Medals']]
+    medal_sum = medal_counts['Gold'] + medal_counts['Silver'] + medal_counts['Bronze']
+    bad_counts = medal_counts.loc[(medal_counts['Gold'] > medal_counts['Total']) | (medal_sum != medal_counts['Total']),
+                                  ['NOC', 'Year', 'Gold', 'Total']]
+    return pd.concat([bad_features.assign(Table='features'), bad_counts.assign(Table='medal_counts')],
+                     ignore_index=True)
+
+
+def check_one_host_per_year(features):
+    """每届最多一个主办国；建模窗口内的每一届恰好一个。"""
+    hosts = features.groupby('Year')['Is_Host'].sum()
+    bad = (hosts > 1) | ((hosts.index >= MODEL_START_YEAR) & (hosts != 1))
+    return hosts[bad].rename('Hosts').reset_index()
+
+
+def check_model_features(features):
+    """建模窗口内的模型特征不含缺失值或无穷值。"""
+    window = features[features['Year'] >= MODEL_START_YEAR]
+    values = window[MODEL_FEATURES].to_numpy(dtype=float)
+    bad = ~np.isfinite(values)
+    rows = bad.any(axis=1)
+    return pd.DataFrame({
+        'NOC': window['NOC'].to_numpy()[rows],
+        'Year': window['Year'].to_numpy()[rows],
+        'Columns': [', '.join(np.array(MODEL_FEATURES)[mask]) for mask in bad[rows]],
+    })
+
+
+# 检查名 -> (检查函数, 所需的表)
+CHECKS = {
+    'noc_codes_mapped': (check_noc_codes, ['features']),
+    'features_match_medal_counts': (check_features_vs_medal_counts, ['features', 'medal_counts']),
+    'athletes_match_medal_counts': (check_athletes_vs_medal_counts, ['athletes', 'medal_counts']),
+    'gold_le_total': (check_gold_le_total, ['features', 'medal_counts']),
+    'one_host_per_year': (check_one_host_per_year, ['features']),
+    'model_features_complete': (check_model_features, ['features']),
+}
+
+
+def load_tables(names):
+    """每张表只读取一次；文件不存在的表记为 None，依赖它的检查会被跳过。"""
+    tables = {}
+    for name in names:
+        try:
+            tables[name] = load_table(name, usecols=TABLE_COLUMNS[name])
+        except FileNotFoundError:
+            tables[name] = None
+    return tables
+
+
+def run_checks(checks=CHECKS):
+    """执行全部检查，返回 {检查名: 违规行 DataFrame 或 None(跳过)}。"""
+    tables = load_tables(sorted({table for _, required in checks.values() for table in required}))
+    results = {}
+    for name, (check, required) in checks.items():
+        if any(tables[table] is None for table in required):
+            results[name] = None
+        else:
+            results[name] = check(*(tables[table] for table in required))
+    return results
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 80)
+    print("特征数据集一致性检查")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    results = run_checks()
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    print()
+    for name, violations in results.items():
+        if violations is None:
+            print(f"  - {name}: 跳过（缺少输入文件）")
+        elif len(violations) == 0:
+            print(f"  ✓ {name}")
+        else:
+            failed += 1
+            print(f"  ✗ {name}: {len(violations)} 处违反 —— {CHECKS[name][0].__doc__}")
+            print(violations.head(10).to_string(index=False))
+
+    print(f"\n共 {len(results)} 项检查，失败 {failed} 项，耗时 {elapsed:.2f} 秒")
+    if failed:
+        print("=" * 80 + "\n")
+        sys.exit(1)
+    print("\n验证完成! ✓")
+    print("=" * 80 + "\n")